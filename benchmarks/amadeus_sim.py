@@ -0,0 +1,247 @@
+"""
+Local stand-in for the Amadeus self-service APIs used by the agent tools.
+
+Serves OAuth, flight offers/destinations/pricing/orders and the hotel
+reference, offers, sentiments and booking endpoints with synthetic but
+correctly shaped data. Every response waits `latency_ms` (+/- `jitter_ms`)
+and fails with `error_status` at `error_rate`, so upstream behaviour can be
+varied without touching the real API.
+
+    python -m benchmarks.amadeus_sim --port 8765 --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+CARRIERS = ["AF", "BA", "KL", "LH", "EK", "QR", "TK", "DL", "UA", "ET"]
+
+
+@dataclass
+class SimConfig:
+    latency_ms: float = 120.0
+    jitter_ms: float = 40.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    offers_per_search: int = 10
+    hotels_per_city: int = 30
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Deterministic randomness per request so identical queries get identical answers."""
+    seed = hashlib.sha1("|".join(map(str, parts)).encode()).digest()
+    return random.Random(int.from_bytes(seed[:8], "big"))
+
+
+def _itinerary(rng: random.Random, origin: str, destination: str, day: str, carrier: str) -> Dict[str, Any]:
+    depart = datetime.fromisoformat(day) + timedelta(hours=rng.randint(5, 22), minutes=rng.choice([0, 15, 30, 45]))
+    stops = rng.choice([0, 0, 1])
+    hops = [origin] + (["CDG" if origin != "CDG" and destination != "CDG" else "AMS"] if stops else []) + [destination]
+    segments, at = [], depart
+    for i, (a, b) in enumerate(zip(hops, hops[1:])):
+        minutes = rng.randint(60, 480)
+        arrive = at + timedelta(minutes=minutes)
+        segments.append({
+            "departure": {"iataCode": a, "at": at.isoformat()},
+            "arrival": {"iataCode": b, "at": arrive.isoformat()},
+            "carrierCode": carrier,
+            "number": str(rng.randint(100, 9999)),
+            "aircraft": {"code": rng.choice(["320", "359", "77W", "788"])},
+            "operating": {"carrierCode": carrier},
+            "duration": f"PT{minutes // 60}H{minutes % 60}M",
+            "id": str(i + 1),
+            "numberOfStops": 0,
+        })
+        at = arrive + timedelta(minutes=rng.randint(60, 150))
+    total = int((arrive - depart).total_seconds() // 60)
+    return {"duration": f"PT{total // 60}H{total % 60}M", "segments": segments}
+
+
+def flight_offers(params: Dict[str, str], count: int) -> List[Dict[str, Any]]:
+    origin, destination = params.get("originLocationCode", "LOS"), params.get("destinationLocationCode", "LHR")
+    day = params.get("departureDate") or (date.today() + timedelta(days=30)).isoformat()
+    rng = _rng(origin, destination, day, params.get("returnDate"), params.get("travelClass"))
+    offers = []
+    for i in range(min(count, int(params.get("max", count)))):
+        carrier = rng.choice(CARRIERS)
+        itineraries = [_itinerary(rng, origin, destination, day, carrier)]
+        if params.get("returnDate"):
+            itineraries.append(_itinerary(rng, destination, origin, params["returnDate"], carrier))
+        total = f"{rng.uniform(150, 2400):.2f}"
+        offers.append({
+            "type": "flight-offer",
+            "id": str(i + 1),
+            "source": "GDS",
+            "numberOfBookableSeats": rng.randint(1, 9),
+            "itineraries": itineraries,
+            "price": {"currency": "USD", "total": total, "base": f"{float(total) * 0.6:.2f}", "grandTotal": total},
+            "validatingAirlineCodes": [carrier],
+            "travelerPricings": [{
+                "travelerId": "1",
+                "fareOption": "STANDARD",
+                "travelerType": "ADULT",
+                "price": {"currency": "USD", "total": total},
+                "fareDetailsBySegment": [
+                    {"segmentId": s["id"], "cabin": params.get("travelClass", "ECONOMY"), "class": "Y"}
+                    for it in itineraries for s in it["segments"]
+                ],
+            }],
+        })
+    return offers
+
+
+def create_app(config: SimConfig | None = None) -> FastAPI:
+    app = FastAPI(title="Amadeus simulator")
+    app.state.config = config or SimConfig()
+    app.state.calls = Counter()
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        cfg: SimConfig = app.state.config
+        if request.url.path.startswith("/_sim"):
+            return await call_next(request)
+        app.state.calls[request.url.path] += 1
+        delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            headers = {"Retry-After": "1"} if cfg.error_status == 429 else {}
+            return JSONResponse(
+                {"errors": [{"status": cfg.error_status, "title": "INJECTED ERROR"}]},
+                status_code=cfg.error_status,
+                headers=headers,
+            )
+        return await call_next(request)
+
+    @app.get("/_sim/stats")
+    async def stats():
+        return dict(app.state.calls)
+
+    @app.head("/")
+    async def root():
+        return {}
+
+    @app.post("/v1/security/oauth2/token")
+    async def token():
+        return {"type": "amadeusOAuth2Token", "access_token": uuid.uuid4().hex, "expires_in": 1799}
+
+    @app.get("/v2/shopping/flight-offers")
+    async def offers(request: Request):
+        data = flight_offers(dict(request.query_params), app.state.config.offers_per_search)
+        return {"meta": {"count": len(data)}, "data": data}
+
+    @app.get("/v1/shopping/flight-destinations")
+    async def destinations(request: Request):
+        origin = request.query_params.get("origin", "LOS")
+        rng = _rng("destinations", origin)
+        day = date.today() + timedelta(days=30)
+        return {"data": [
+            {
+                "type": "flight-destination",
+                "origin": origin,
+                "destination": rng.choice(["LHR", "CDG", "DXB", "JFK", "ACC", "NBO", "IST", "AMS"]),
+                "departureDate": (day + timedelta(days=i)).isoformat(),
+                "returnDate": (day + timedelta(days=i + 7)).isoformat(),
+                "price": {"total": f"{rng.uniform(150, 1500):.2f}"},
+            }
+            for i in range(10)
+        ]}
+
+    @app.post("/v1/shopping/flight-offers/pricing")
+    async def pricing(request: Request):
+        body = await request.json()
+        offers = body.get("data", {}).get("flightOffers", [])
+        return {"data": {"type": "flight-offers-pricing", "flightOffers": offers}}
+
+    @app.post("/v1/booking/flight-orders")
+    async def flight_order(request: Request):
+        body = await request.json()
+        return JSONResponse(status_code=201, content={"data": {
+            "type": "flight-order",
+            "id": uuid.uuid4().hex,
+            "associatedRecords": [{"reference": uuid.uuid4().hex[:6].upper()}],
+            "flightOffers": body.get("data", {}).get("flightOffers", []),
+        }})
+
+    def hotels(city: str) -> List[Dict[str, Any]]:
+        return [
+            {"hotelId": f"{city[:3]}{i:05d}", "name": f"{city.title()} Hotel {i}", "iataCode": city}
+            for i in range(app.state.config.hotels_per_city)
+        ]
+
+    @app.get("/v1/reference-data/locations/hotels/by-city")
+    async def by_city(cityCode: str):
+        return {"data": hotels(cityCode.upper())}
+
+    @app.get("/v1/reference-data/locations/hotels/by-geocode")
+    async def by_geocode(latitude: float, longitude: float):
+        return {"data": hotels(f"G{abs(int(latitude)) % 100:02d}")}
+
+    @app.get("/v1/reference-data/locations/hotels/by-hotels")
+    async def by_hotels(hotelIds: str):
+        return {"data": [{"hotelId": h, "name": f"Hotel {h}"} for h in hotelIds.split(",")]}
+
+    @app.get("/v3/shopping/hotel-offers")
+    async def hotel_offers(hotelIds: str, checkInDate: str = None, checkOutDate: str = None):
+        check_in = checkInDate or (date.today() + timedelta(days=30)).isoformat()
+        check_out = checkOutDate or (date.fromisoformat(check_in) + timedelta(days=2)).isoformat()
+        data = []
+        for hotel_id in hotelIds.split(","):
+            rng = _rng(hotel_id, check_in, check_out)
+            data.append({
+                "type": "hotel-offers",
+                "hotel": {"hotelId": hotel_id, "name": f"Hotel {hotel_id}"},
+                "available": rng.random() > 0.2,
+                "offers": [{
+                    "id": uuid.UUID(int=rng.getrandbits(128)).hex[:10].upper(),
+                    "checkInDate": check_in,
+                    "checkOutDate": check_out,
+                    "room": {"description": {"text": "Standard room, one king bed"}},
+                    "price": {"currency": "USD", "total": f"{rng.uniform(60, 600):.2f}"},
+                }],
+            })
+        return {"data": data}
+
+    @app.get("/v2/e-reputation/hotel-sentiments")
+    async def sentiments(hotelIds: str):
+        return {"data": [
+            {"type": "hotelSentiment", "hotelId": h, "overallRating": _rng("rating", h).randint(55, 98)}
+            for h in hotelIds.split(",")
+        ]}
+
+    @app.post("/v2/booking/hotel-orders")
+    async def hotel_order():
+        return JSONResponse(status_code=201, content={"data": {
+            "type": "hotel-order",
+            "id": uuid.uuid4().hex,
+            "hotelBookings": [{"id": uuid.uuid4().hex[:12], "bookingStatus": "CONFIRMED"}],
+        }})
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=SimConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=SimConfig.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=SimConfig.error_rate)
+    parser.add_argument("--error-status", type=int, default=SimConfig.error_status)
+    args = parser.parse_args()
+
+    config = SimConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Scripted chat model for driving the real agent without Gemini.
+
+The model is stateless: it looks at the conversation it is given and,
+for a fresh user message, issues the configured tool calls; once tool
+results are in, it streams a final answer. Concurrent sessions can
+therefore share one instance. Delays model time-to-first-token and
+per-token generation so benchmarks see realistic streaming.
+"""
+import asyncio
+import hashlib
+import uuid
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+ROUTES = [
+    ("LOS", "LHR"), ("LOS", "DXB"), ("ABV", "ACC"), ("JFK", "CDG"), ("LHR", "NBO"),
+    ("DXB", "BOM"), ("CDG", "IST"), ("AMS", "JNB"), ("LOS", "JFK"), ("ACC", "AMS"),
+]
+FILLER = (
+    "Here are the best options I found for your trip, ranked by price and total travel time. "
+    "The cheapest fare has one stop while the fastest is nonstop, and both have seats left. "
+    "Let me know which one you would like me to price and book."
+).split(" ")
+
+
+def search_flights_plan(messages: List[BaseMessage], variants: int) -> List[Dict[str, Any]]:
+    """One search_flights call whose route and date vary with the user message."""
+    text = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+    n = int.from_bytes(hashlib.sha1(str(text).encode()).digest()[:4], "big") % max(variants, 1)
+    origin, destination = ROUTES[n % len(ROUTES)]
+    day = date.today() + timedelta(days=14 + n // len(ROUTES))
+    return [{"name": "search_flights", "args": {
+        "origin": origin, "destination": destination, "departure_date": day.isoformat(),
+    }}]
+
+
+class ScriptedChatModel(BaseChatModel):
+    first_token_delay: float = 0.4
+    token_delay: float = 0.015
+    reply_words: int = 40
+    # Distinct searches the plan spreads over; lower values mean more cache hits.
+    search_variants: int = 50
+    use_tools: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.use_tools and not isinstance(messages[-1], ToolMessage):
+            calls = search_flights_plan(messages, self.search_variants)
+            return AIMessage(content="", tool_calls=[
+                {**call, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"} for call in calls
+            ])
+        words = [FILLER[i % len(FILLER)] for i in range(self.reply_words)]
+        return AIMessage(content=" ".join(words))
+
+    @staticmethod
+    def _usage(messages: List[BaseMessage], reply: AIMessage) -> Dict[str, int]:
+        # Rough 4-characters-per-token estimate; good enough for load shaping.
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        completion = max(1, (len(str(reply.content)) + len(str(reply.tool_calls))) // 4)
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        reply = self._reply(messages)
+        reply.usage_metadata = self._usage(messages, reply)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        reply = self._reply(messages)
+        usage = self._usage(messages, reply)
+        await asyncio.sleep(self.first_token_delay)
+
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": orjson.dumps(c["args"]).decode(), "id": c["id"], "index": i}
+                    for i, c in enumerate(reply.tool_calls)
+                ],
+                usage_metadata=usage,
+            ))
+            return
+
+        words = str(reply.content).split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word if last else word + " ",
+                usage_metadata=usage if last else None,
+            ))
+
+
+def scripted_model(**overrides: Optional[Any]) -> ScriptedChatModel:
+    return ScriptedChatModel(**{k: v for k, v in overrides.items() if v is not None})
@@ -0,0 +1,217 @@
+"""
+Load driver for the chat SSE endpoint.
+
+By default it runs everything in one process: the Amadeus simulator, the
+real app (lifespan, tools, caches, rate limiting) with the scripted fake
+model in place of Gemini, and the client. For each concurrency level it
+sends --requests chat turns to GET /stream, each in its own session, and
+reports throughput, time to first token (first `delta` event) and
+end-to-end latency percentiles.
+
+    python -m benchmarks.load --concurrency 1,8,32,64 --requests 128
+    python -m benchmarks.load --url http://127.0.0.1:8000   # an already running server
+
+The in-process client shares the event loop with the server, so absolute
+numbers include some client overhead; compare runs against each other.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import orjson
+
+
+@dataclass
+class Sample:
+    ok: bool
+    ttft: Optional[float]
+    latency: float
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    samples: List[Sample] = field(default_factory=list)
+    wall: float = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        ok = [s for s in self.samples if s.ok]
+        ttfts = sorted(s.ttft for s in ok if s.ttft is not None)
+        latencies = sorted(s.latency for s in ok)
+        return {
+            "concurrency": self.concurrency,
+            "requests": len(self.samples),
+            "errors": len(self.samples) - len(ok),
+            "throughput_rps": len(ok) / self.wall if self.wall else 0.0,
+            **{f"ttft_p{p}_ms": percentile(ttfts, p) * 1000 for p in (50, 95, 99)},
+            **{f"latency_p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 95, 99)},
+        }
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted `values` (0 when empty)."""
+    if not values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def one_turn(client: httpx.AsyncClient, url: str, prompt: str) -> Sample:
+    started = time.perf_counter()
+    ttft = None
+    ok = False
+    try:
+        params = {"prompt": prompt, "session_id": f"bench_{uuid.uuid4().hex}"}
+        async with client.stream("GET", f"{url}/stream", params=params) as response:
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    if event == "delta" and ttft is None:
+                        ttft = time.perf_counter() - started
+                    elif event == "done":
+                        ok = response.status_code == 200
+                    elif event == "error":
+                        ok = False
+                        break
+    except httpx.HTTPError:
+        ok = False
+    return Sample(ok=ok, ttft=ttft, latency=time.perf_counter() - started)
+
+
+async def run_level(url: str, concurrency: int, requests: int) -> LevelResult:
+    result = LevelResult(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"Find me a flight, request {i} {uuid.uuid4().hex[:6]}")
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0), limits=limits) as client:
+        async def worker():
+            while not queue.empty():
+                prompt = queue.get_nowait()
+                result.samples.append(await one_turn(client, url, prompt))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.wall = time.perf_counter() - started
+    return result
+
+
+async def serve(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def in_process(args) -> str:
+    """Start the simulator and the app in this process; returns the app URL."""
+    from benchmarks.amadeus_sim import SimConfig, create_app
+
+    sim_port, app_port = free_port(), free_port()
+    sim = create_app(SimConfig(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    ))
+    args.servers = [await serve(sim, sim_port)]
+
+    # Settings are read at import, so point the app at the simulator before importing it.
+    scratch = tempfile.mkdtemp(prefix="viazuri-bench-")
+    os.environ["AMADEUS_BASE_URL"] = f"http://127.0.0.1:{sim_port}"
+    os.environ.setdefault("AMADEUS_CLIENT_ID", "bench")
+    os.environ.setdefault("AMADEUS_CLIENT_SECRET", "bench")
+    os.environ.setdefault("AMADEUS_RATE_LIMIT", "1000")
+    os.environ.setdefault("HOTEL_CACHE_PATH", os.path.join(scratch, "amadeus.sqlite3"))
+    os.environ["AGENT_WARMUP"] = "false"
+
+    import main
+    from benchmarks.fake_llm import scripted_model
+    from src.llm.agent import use_model
+
+    use_model(scripted_model(
+        first_token_delay=args.first_token_ms / 1000,
+        token_delay=args.token_ms / 1000,
+        search_variants=args.search_variants,
+    ))
+    args.servers.append(await serve(main.app, app_port))
+    args.sim_url = os.environ["AMADEUS_BASE_URL"]
+    return f"http://127.0.0.1:{app_port}"
+
+
+def print_table(rows: List[Dict[str, float]]) -> None:
+    columns = ["concurrency", "requests", "errors", "throughput_rps",
+               "ttft_p50_ms", "ttft_p95_ms", "ttft_p99_ms",
+               "latency_p50_ms", "latency_p95_ms", "latency_p99_ms"]
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("  ".join(
+            f"{row[c]:>14.1f}" if isinstance(row[c], float) else f"{row[c]:>14}" for c in columns
+        ))
+
+
+async def run(args) -> List[Dict[str, float]]:
+    args.servers = []
+    url = args.url or await in_process(args)
+    try:
+        rows = []
+        for concurrency in args.concurrency:
+            level = await run_level(url, concurrency, args.requests)
+            rows.append(level.summary())
+        print_table(rows)
+        if not args.url:
+            async with httpx.AsyncClient() as client:
+                calls = (await client.get(f"{args.sim_url}/_sim/stats")).json()
+            print("upstream calls:", ", ".join(f"{k}={v}" for k, v in sorted(calls.items())))
+        return rows
+    finally:
+        for server, task in reversed(args.servers):
+            server.should_exit = True
+            await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        type=lambda v: [int(x) for x in v.split(",")], help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=64, help="chat turns per concurrency level")
+    parser.add_argument("--first-token-ms", type=float, default=400, help="fake model time to first token")
+    parser.add_argument("--token-ms", type=float, default=15, help="fake model delay between tokens")
+    parser.add_argument("--search-variants", type=int, default=50, help="distinct flight searches (cache pressure)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=120)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "wb") as f:
+            f.write(orjson.dumps(rows, option=orjson.OPT_INDENT_2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Replay recorded chat turns offline and check them against the recording.
+
+Record in production (or locally) with CASSETTE_MODE=record; each session is
+written to CASSETTE_DIR/<session_id>.jsonl. Replaying runs the real agent and
+tools against the recorded model responses and upstream exchanges, prints
+per-turn timings and exits non-zero when the number of model or tool calls
+differs from the recording.
+
+    python -m benchmarks.replay cassettes/chat_123.jsonl --pace --repeat 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassettes", nargs="+", help="cassette files to replay")
+    parser.add_argument("--pace", action="store_true", help="wait recorded model and upstream latencies")
+    parser.add_argument("--repeat", type=int, default=1, help="replay each cassette this many times")
+    args = parser.parse_args()
+
+    # Replays must not re-record, touch real services or reuse persisted state.
+    scratch = tempfile.mkdtemp(prefix="viazuri-replay-")
+    os.environ["CASSETTE_MODE"] = "off"
+    os.environ["SESSION_BACKEND"] = "memory"
+    os.environ["JOB_BACKEND"] = "memory"
+    os.environ["AGENT_WARMUP"] = "false"
+    os.environ.setdefault("AMADEUS_BASE_URL", "http://amadeus.replay")
+    os.environ["AMADEUS_RATE_LIMIT"] = "0"
+    os.environ["HOTEL_CACHE_PATH"] = os.path.join(scratch, "amadeus.sqlite3")
+
+    from src.cassette.replay import replay
+
+    failed = False
+    print(f"{'turn':>4}  {'llm':>7}  {'tools':>7}  {'misses':>6}  {'recorded ms':>11}  {'replay ms':>9}  {'ttft ms':>7}  prompt")
+    for path in args.cassettes:
+        for run in range(args.repeat):
+            print(f"# {path} (run {run + 1})")
+            for i, r in enumerate(asyncio.run(replay(path, pace=args.pace)), 1):
+                failed |= not r.ok
+                mark = "" if r.ok else "  <-- MISMATCH" + (f" ({r.error})" if r.error else "")
+                print(
+                    f"{i:>4}  {r.llm_calls:>3}/{r.expected_llm_calls:<3}  {r.tool_calls:>3}/{r.expected_tool_calls:<3}  "
+                    f"{r.http_misses:>6}  {r.recorded_ms or 0:>11.1f}  {r.elapsed_ms:>9.1f}  "
+                    f"{r.first_token_ms or 0:>7.1f}  {r.prompt[:40]!r}{mark}"
+                )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
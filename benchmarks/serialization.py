@@ -0,0 +1,152 @@
+"""
+Validate/serialize microbenchmark for the schemas sent to and from Amadeus.
+
+For each schema it times, in microseconds per operation:
+
+- `model_validate` against the cached `TypeAdapter` (Python and JSON input),
+  a `TypeAdapter` built per call, and the `construct` fast path
+- the old dump path (`model_dump(mode="json")` then stdlib `json.dumps`, as
+  httpx does for `json=`) against `dump_json` bytes
+
+    python -m benchmarks.serialization --number 2000
+"""
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from pydantic import TypeAdapter
+
+from src.schemas.flight import FlightOffer
+from src.schemas.hotel import HotelOrderSchema
+from src.schemas.order import CreateFlightOrder
+from src.schemas.serialization import adapter, construct, dump_json, validate, validate_json
+from src.schemas.traveller import TravellerObject
+
+
+def _segment(i: int) -> Dict[str, Any]:
+    return {
+        "departure": {"iataCode": "LOS", "terminal": "1", "at": "2026-11-02T10:00:00"},
+        "arrival": {"iataCode": "LHR", "terminal": "5", "at": "2026-11-02T16:30:00"},
+        "carrierCode": "BA",
+        "number": str(70 + i),
+        "aircraft": {"code": "789"},
+        "operating": {"carrierCode": "BA"},
+        "duration": "PT6H30M",
+        "id": str(i + 1),
+        "numberOfStops": 0,
+        "blacklistedInEU": False,
+    }
+
+
+def flight_offer(segments: int = 4) -> Dict[str, Any]:
+    """A fully populated FlightOffer: a round trip with `segments` segments in total."""
+    half = segments // 2
+    price = {"currency": "USD", "total": "812.40", "base": "501.00", "grandTotal": "812.40",
+             "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}]}
+    return {
+        "type": "flight-offer",
+        "id": "1",
+        "source": "GDS",
+        "instantTicketingRequired": False,
+        "nonHomogeneous": False,
+        "oneWay": False,
+        "isUpsellOffer": False,
+        "lastTicketingDate": "2026-10-30",
+        "lastTicketingDateTime": "2026-10-30",
+        "numberOfBookableSeats": 7,
+        "itineraries": [
+            {"duration": "PT14H10M", "segments": [_segment(i) for i in range(half)]},
+            {"duration": "PT13H55M", "segments": [_segment(i) for i in range(half, segments)]},
+        ],
+        "price": price,
+        "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": True},
+        "validatingAirlineCodes": ["BA"],
+        "travelerPricings": [{
+            "travelerId": "1",
+            "fareOption": "STANDARD",
+            "travelerType": "ADULT",
+            "price": {"currency": "USD", "total": "812.40", "base": "501.00"},
+            "fareDetailsBySegment": [{
+                "segmentId": str(i + 1),
+                "cabin": "ECONOMY",
+                "fareBasis": "OLNCGB",
+                "brandedFare": "BASIC",
+                "brandedFareLabel": "ECONOMY BASIC",
+                "class": "O",
+                "includedCheckedBags": {"quantity": 0},
+                "includedCabinBags": {"quantity": 1},
+                "amenities": [{
+                    "description": "CHECKED BAG 1PC OF 23KG",
+                    "isChargeable": True,
+                    "amenityType": "BAGGAGE",
+                    "amenityProvider": {"name": "BrandedFare"},
+                }],
+            } for i in range(segments)],
+        }],
+    }
+
+
+def hotel_order(guests: int = 2) -> Dict[str, Any]:
+    return {"data": {
+        "type": "hotel-order",
+        "guests": [{"tid": i + 1, "title": "MR", "firstName": "BOB", "lastName": "SMITH",
+                    "phone": "+33679278416", "email": "bob.smith@email.com"} for i in range(guests)],
+        "travelAgent": {"contact": {"email": "bob.smith@email.com"}},
+        "roomAssociations": [{"guestReferences": [{"guestReference": "1"}], "hotelOfferId": "4L8PRJPEN7"}],
+        "payment": {"method": "CREDIT_CARD", "paymentCard": {"paymentCardInfo": {
+            "vendorCode": "VI", "cardNumber": "4151289722471370", "expiryDate": "2026-08-01", "holderName": "BOB SMITH",
+        }}},
+    }}
+
+
+def cases() -> List[Tuple[str, type, Dict[str, Any]]]:
+    order = CreateFlightOrder.example().model_dump(mode="json", by_alias=True)
+    order["data"]["flightOffers"] = [flight_offer()]
+    return [
+        ("FlightOffer", FlightOffer, flight_offer()),
+        ("TravellerObject", TravellerObject, TravellerObject.example().model_dump(mode="json")),
+        ("HotelOrderSchema", HotelOrderSchema, hotel_order()),
+        ("CreateFlightOrder", CreateFlightOrder, order),
+    ]
+
+
+def per_op_us(fn: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def bench(name: str, model: type, data: Dict[str, Any], number: int) -> Dict[str, Any]:
+    raw = json.dumps(data).encode()
+    validated = validate(model, data)
+    constructed = construct(model, data)
+    assert dump_json(constructed) == dump_json(validated), f"{name}: construct and validate dump differently"
+    adapter(model)  # built outside the timings
+
+    return {
+        "schema": name,
+        "bytes": len(raw),
+        "model_validate": per_op_us(lambda: model.model_validate(data), number),
+        "adapter_python": per_op_us(lambda: validate(model, data), number),
+        "adapter_json": per_op_us(lambda: validate_json(model, raw), number),
+        "adapter_uncached": per_op_us(lambda: TypeAdapter(model).validate_python(data), max(1, number // 20)),
+        "construct": per_op_us(lambda: construct(model, data), number),
+        "dump_stdlib": per_op_us(lambda: json.dumps(validated.model_dump(mode="json", by_alias=True)).encode(), number),
+        "dump_json": per_op_us(lambda: dump_json(validated), number),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing")
+    args = parser.parse_args()
+
+    rows = [bench(name, model, data, args.number) for name, model, data in cases()]
+    columns = list(rows[0])
+    print("  ".join(f"{c:>17}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{row[c]:>17.1f}" if isinstance(row[c], float) else f"{row[c]:>17}" for c in columns))
+    print("(microseconds per call; bytes is the JSON size of the payload)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Import-time budget for the web app.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, reports
+wall time and the modules with the largest cumulative import cost, and exits
+non-zero when the total exceeds --budget-ms. With --warmup it also times the
+lazy agent build that happens on first use.
+
+    python benchmarks/startup.py --budget-ms 1500 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run(code: str) -> tuple[float, str]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(result.stderr[-2000:])
+    return elapsed, result.stderr
+
+
+def parse(report: str) -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) rows from an -X importtime report."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module[1:].rstrip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if `import main` exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="modules to list by cumulative time")
+    parser.add_argument("--warmup", action="store_true", help="also time building the agent")
+    args = parser.parse_args()
+
+    wall, report = run("import main")
+    rows = parse(report)
+    top_level = [r for r in rows if not r[2].startswith(" ")]
+    total_ms = sum(r[1] for r in top_level) / 1000
+
+    print(f"import main: {total_ms:.0f} ms imports, {wall * 1000:.0f} ms process wall time")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, module in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module.strip()}")
+
+    if args.warmup:
+        wall_warm, _ = run(
+            "import time, main; from src.llm.agent import get_agent; "
+            "t = time.perf_counter(); get_agent(); print(time.perf_counter() - t)"
+        )
+        print(f"import main + agent build: {wall_warm * 1000:.0f} ms process wall time")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,161 @@
+import asyncio
+import zlib
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, Query
-from fastapi.responses import StreamingResponse, HTMLResponse
+from typing import Optional
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, HTMLResponse, PlainTextResponse
+from pydantic import ValidationError
+from src.configs.env import AGENT_WARMUP, CHAT_MAX_BODY_BYTES, SSE_DISCONNECT_POLL_INTERVAL
+from src.configs.admission import Overloaded, Ticket, admission
+from src.broker.consumer import job_consumer
+from src.broker.queue import job_queue
+from src.configs.http import AsyncHTTPRequest
+from src.configs.metrics import registry
+from src.llm.agent import warmup
 from src.llm.core import stream_response
+from src.llm.sse import sse_event, until_disconnected
+from src.schemas.chat import ChatRequest, new_session_id
+from src.tools.jobs import session_job
 
-app = FastAPI()
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await AsyncHTTPRequest.startup()
+    await job_consumer.start()
+    # Build the agent in the background so the worker accepts connections immediately;
+    # a request arriving first simply waits for the same build.
+    warming = asyncio.create_task(warmup()) if AGENT_WARMUP else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    await job_consumer.stop()
+    await AsyncHTTPRequest.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class AdmittedStream(StreamingResponse):
+    """An SSE response that hands its admission slot back when the response ends, however it ends."""
+
+    def __init__(self, content, ticket: Ticket):
+        # The session id is echoed so a client that let the server pick one can continue the conversation.
+        headers = {**SSE_HEADERS, "X-Session-Id": ticket.session_id}
+        super().__init__(content, media_type="text/event-stream", headers=headers)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
+
+
+async def admit(session_id: str) -> Ticket:
+    """Admit one chat turn, or shed it with a fast 503 and a Retry-After hint."""
+    try:
+        return await admission.admit(session_id)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def read_body(request: Request) -> bytes:
+    """
+    Read the request body as it arrives, inflating gzip chunk by chunk.
+
+    CHAT_MAX_BODY_BYTES bounds the bytes received (checked against
+    Content-Length first) and the decompressed size, so an oversized body
+    or a gzip bomb is rejected with 413 without being buffered whole.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > CHAT_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    received = 0
+    body = bytearray()
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > CHAT_MAX_BODY_BYTES:
+                raise HTTPException(status_code=413, detail="Request body too large")
+            if inflater is not None:
+                chunk = inflater.decompress(chunk, CHAT_MAX_BODY_BYTES + 1 - len(body))
+                if inflater.unconsumed_tail:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            body += chunk
+            if len(body) > CHAT_MAX_BODY_BYTES:
+                raise HTTPException(status_code=413, detail="Request body too large")
+        if inflater is not None:
+            body += inflater.flush()
+            if not inflater.eof:
+                raise zlib.error("truncated gzip stream")
+    except zlib.error:
+        raise HTTPException(status_code=400, detail="Malformed gzip body")
+    if len(body) > CHAT_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    return bytes(body)
+
+
+@app.post("/chat/stream")
+async def chat_stream_post(request: Request):
+    body = await read_body(request)
+    try:
+        payload = ChatRequest.model_validate(orjson.loads(body))
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    ticket = await admit(payload.session_id)
+    return AdmittedStream(
+        until_disconnected(
+            stream_response(payload.prompt, payload.session_id),
+            request.is_disconnected,
+            SSE_DISCONNECT_POLL_INTERVAL,
+        ),
+        ticket,
+    )
 
 @app.get("/stream")
 async def chat_stream(
+    request: Request,
     prompt: str = Query(...),
-    session_id: str = Query("default"),
-    history: str = Query(None)  # Client sends last 10 messages
+    session_id: Optional[str] = Query(None, max_length=128),
 ):
+    session_id = session_id or new_session_id()
+    ticket = await admit(session_id)
+    event_generator = until_disconnected(
+        stream_response(prompt, session_id), request.is_disconnected, SSE_DISCONNECT_POLL_INTERVAL
+    )
+    return AdmittedStream(event_generator, ticket)
+
+# Jobs are only visible to the session that started them; any other session gets a 404.
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, session_id: str = Query(..., max_length=128)):
+    job = await session_job(job_id, session_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.view()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, session_id: str = Query(..., max_length=128)):
+    if await session_job(job_id, session_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
     async def event_generator():
-        async for token in stream_response(prompt, session_id, history):
-            yield token
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+        async for view in job_queue.watch(job_id):
+            yield sse_event("job", view)
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/", response_class=HTMLResponse)
 async def chat_page():
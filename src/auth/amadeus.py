@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.configs.http import AsyncHTTPRequest, Methods
+from src.configs.env import (
+    AMADEUS_CLIENT_ID,
+    AMADEUS_CLIENT_SECRET,
+    AMADEUS_BASE_URL,
+    AMADEUS_TOKEN_REFRESH_MARGIN,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+class AmadeusAuth:
+    """
+    Process-wide OAuth2 token manager shared by every Amadeus tool.
+
+    - Tokens are refreshed `AMADEUS_TOKEN_REFRESH_MARGIN` seconds before `expires_in`.
+    - Concurrent callers with a stale cache await one shared refresh (single-flight).
+    - `request` retries a 401 once with a freshly issued token.
+    """
+
+    _access_token: str | None = None
+    _expires_at: float = 0.0
+    _refresh: Optional[asyncio.Task] = None
+
+    @classmethod
+    def _is_fresh(cls) -> bool:
+        return (
+            cls._access_token is not None
+            and time.monotonic() < cls._expires_at - AMADEUS_TOKEN_REFRESH_MARGIN
+        )
+
+    @classmethod
+    async def _fetch_token(cls) -> str:
+        response = await AsyncHTTPRequest.request(
+            method=Methods.POST,
+            url=f"{AMADEUS_BASE_URL}/v1/security/oauth2/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data={
+                "grant_type": "client_credentials",
+                "client_id": AMADEUS_CLIENT_ID,
+                "client_secret": AMADEUS_CLIENT_SECRET
+            }
+        )
+        cls._expires_at = time.monotonic() + float(response.get("expires_in", 1799))
+        cls._access_token = response["access_token"]
+        return cls._access_token
+
+    @classmethod
+    async def get_token(cls) -> str:
+        if cls._is_fresh():
+            return cls._access_token
+
+        if cls._refresh is None or cls._refresh.done():
+            cls._refresh = asyncio.create_task(cls._fetch_token())
+
+        # Shielded so a cancelled caller does not abort the refresh other callers wait on.
+        return await asyncio.shield(cls._refresh)
+
+    @classmethod
+    def invalidate(cls, token: str) -> None:
+        """Drop `token` from the cache unless a newer token has already replaced it."""
+        if cls._access_token == token:
+            cls._access_token = None
+            cls._expires_at = 0.0
+
+    @classmethod
+    async def request(
+        cls,
+        *,
+        url: str,
+        method: Methods,
+        headers: Dict[str, str] | None = None,
+        **options: Any,
+    ):
+        """Send an authenticated request through `AsyncHTTPRequest`, retrying a 401 once."""
+        token = await cls.get_token()
+        try:
+            return await AsyncHTTPRequest.request(
+                url=url,
+                method=method,
+                headers={**(headers or {}), "Authorization": f"Bearer {token}"},
+                **options,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
+            logger.info("Amadeus rejected the access token, refreshing and retrying once")
+            cls.invalidate(token)
+
+        token = await cls.get_token()
+        return await AsyncHTTPRequest.request(
+            url=url,
+            method=method,
+            headers={**(headers or {}), "Authorization": f"Bearer {token}"},
+            **options,
+        )
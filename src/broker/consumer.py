@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+import httpx
+
+from src.broker.handlers import HANDLERS
+from src.broker.job import Job, JobStatus
+from src.broker.queue import JobQueue, job_queue
+from src.configs.env import (
+    JOB_WORKERS,
+    JOB_RETRY_BASE,
+    JOB_RETRY_CAP,
+    JOB_STALE_AFTER,
+    JOB_SWEEP_INTERVAL,
+    JOB_SHUTDOWN_GRACE,
+)
+from src.configs.metrics import registry
+from src.configs.ratelimit import backoff_delay
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Bookings are not idempotent upstream, so a job is only retried when the
+# provider certainly did not act on it: the connection never opened, or the
+# request was rejected as throttled/unavailable.
+RETRY_STATUSES = {429, 503}
+
+
+def retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return False
+
+
+class JobConsumer:
+    """
+    Worker pool draining the job queue.
+
+    Each job is claimed in the store before it runs, so a job is never run
+    twice even when several processes share a SQLite store. Failures that are
+    safe to retry are re-queued with jittered backoff until `max_attempts`;
+    everything else is dead-lettered with its error for inspection. Jobs
+    left running by a worker that died are dead-lettered by a periodic sweep
+    once they have not been updated for `JOB_STALE_AFTER` seconds.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]],
+        workers: int = JOB_WORKERS,
+        retry_base: float = JOB_RETRY_BASE,
+        retry_cap: float = JOB_RETRY_CAP,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._running: Set[str] = set()
+        self._stopping = False
+        self.succeeded = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self, grace: float = JOB_SHUTDOWN_GRACE) -> None:
+        """Stop taking jobs and give running ones `grace` seconds to finish before cancelling them."""
+        self._stopping = True
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        busy = [t for t in self._tasks if t in self._busy]
+        if busy:
+            _, pending = await asyncio.wait(busy, timeout=grace)
+            for task in pending:
+                logger.warning("Cancelling a job still running at shutdown")
+                task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _recover(self) -> None:
+        """Re-queue jobs left queued by a previous run; dead-letter ones that died mid-run."""
+        jobs = await self.queue.store.recoverable()
+        for job in jobs:
+            if job.status == JobStatus.QUEUED:
+                self.queue.put(job.id)
+        await self._dead_letter_stale(jobs)
+
+    async def _dead_letter_stale(self, jobs: List[Job]) -> None:
+        # A job still running here is alive however long it takes; anyone else's must keep updating it.
+        now = time.time()
+        for job in jobs:
+            if job.status != JobStatus.RUNNING or job.id in self._running:
+                continue
+            if now - job.updated_at <= JOB_STALE_AFTER:
+                continue
+            job.status = JobStatus.DEAD
+            job.error = "Interrupted while running; the outcome is unknown and must be checked before retrying."
+            job.outcome_unknown = True
+            await self.queue.store.save(job)
+            self.queue.publish(job)
+            self.dead += 1
+            logger.error(f"Job {job.id} ({job.kind}) was interrupted mid-run and dead-lettered")
+
+    async def _sweep(self) -> None:
+        """Repeat the stale check while running, so jobs not yet stale at startup still reach a terminal state."""
+        while not self._stopping:
+            await asyncio.sleep(JOB_SWEEP_INTERVAL)
+            try:
+                await self._dead_letter_stale(await self.queue.store.recoverable())
+            except Exception as e:
+                logger.error(f"Stale job sweep failed: {e}")
+
+    async def _work(self) -> None:
+        task = asyncio.current_task()
+        while not self._stopping:
+            job_id = await self.queue.get()
+            self._busy.add(task)
+            try:
+                job = await self.queue.store.claim(job_id)
+                if job is None:
+                    continue
+                self.queue.publish(job)
+                self._running.add(job.id)
+                try:
+                    await self._run(job)
+                finally:
+                    self._running.discard(job.id)
+            finally:
+                self._busy.discard(task)
+
+    async def _run(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            job.result = await handler(job.payload)
+            job.status = JobStatus.SUCCEEDED
+            job.error = None
+            self.succeeded += 1
+        except Exception as e:
+            message = str(e).splitlines()[0] if str(e) else repr(e)
+            job.error = f"{type(e).__name__}: {message}"
+            if retryable(e) and job.attempts < job.max_attempts:
+                delay = backoff_delay(job.attempts - 1, self.retry_base, self.retry_cap)
+                job.status = JobStatus.QUEUED
+                await self.queue.store.save(job)
+                self.queue.publish(job)
+                self.queue.put(job.id, delay)
+                self.retried += 1
+                logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed ({message}), retrying in {delay:.1f}s")
+                return
+            job.status = JobStatus.DEAD
+            self.dead += 1
+            logger.error(f"Job {job.id} ({job.kind}) dead-lettered after {job.attempts} attempt(s): {message}")
+
+        await self.queue.store.save(job)
+        self.queue.publish(job)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.depth(),
+            "running": len(self._busy),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+
+job_consumer = JobConsumer(job_queue, HANDLERS)
+registry.collect("agent_jobs", job_consumer.stats)
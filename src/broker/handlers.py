@@ -0,0 +1,22 @@
+from typing import Any, Awaitable, Callable, Dict
+
+# Tool modules are imported on first use so the consumer can start before the agent is built.
+
+
+async def place_flight_order(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from src.tools.flight.amadeus.core import AmadeusFlightTool
+    return await AmadeusFlightTool.create_order(payload)
+
+
+async def place_hotel_order(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from src.schemas.hotel import HotelOrderSchema
+    from src.schemas.serialization import construct
+    from src.tools.hotel.amadeus.core import AmadeusHotelTool
+    # The payload is our own dump of an order the booking tool already validated.
+    return await AmadeusHotelTool.book(construct(HotelOrderSchema, payload))
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    "flight_order": place_flight_order,
+    "hotel_order": place_hotel_order,
+}
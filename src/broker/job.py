@@ -0,0 +1,50 @@
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    # Retries exhausted or the failure was not safe to retry; kept for inspection.
+    DEAD = "dead"
+
+
+TERMINAL_STATUSES = {JobStatus.SUCCEEDED, JobStatus.DEAD}
+
+
+@dataclass
+class Job:
+    kind: str
+    payload: Dict[str, Any]
+    session_id: str = "default"
+    idempotency_key: Optional[str] = None
+    max_attempts: int = 3
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    # Dead with no way to tell whether the work took effect (interrupted mid-run).
+    outcome_unknown: bool = False
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    @property
+    def holds_key(self) -> bool:
+        """Whether resubmitting the same work returns this job; a job that failed lets it be submitted again."""
+        return self.status != JobStatus.DEAD or self.outcome_unknown
+
+    def view(self) -> Dict[str, Any]:
+        """Public status of the job; the payload may hold traveller or card data and is never exposed."""
+        data = asdict(self)
+        del data["payload"]
+        data["status"] = self.status.value
+        return data
@@ -0,0 +1,67 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+
+from src.broker.job import Job
+from src.broker.queue import job_queue
+from src.configs.env import JOB_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+class JobProducer:
+    """
+    Submits background jobs; resubmitting with the same idempotency key returns the original job.
+
+    A job that was dead-lettered no longer holds its key, so the same work
+    can be submitted again, unless its outcome is unknown: that one keeps
+    being returned until someone checks whether it took effect.
+    """
+
+    @staticmethod
+    def idempotency_key(kind: str, session_id: str, payload: Dict[str, Any]) -> str:
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(kind.encode() + b"\0" + session_id.encode() + b"\0" + body).hexdigest()
+
+    @classmethod
+    async def submit(
+        cls,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        session_id: str = "default",
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> Job:
+        """Queue a job. Without an explicit key, the key is derived from kind, session and payload."""
+        candidate = Job(
+            kind=kind,
+            payload=payload,
+            session_id=session_id,
+            idempotency_key=idempotency_key or cls.idempotency_key(kind, session_id, payload),
+            max_attempts=max_attempts,
+        )
+        # Shielded: a turn cancelled by a client disconnect must not leave a stored job unqueued.
+        return await asyncio.shield(cls._enqueue(candidate))
+
+    @staticmethod
+    async def _enqueue(candidate: Job) -> Job:
+        job = await job_queue.store.add(candidate)
+        if job.id != candidate.id:
+            logger.info(f"Job {candidate.kind} deduplicated onto {job.id} ({job.status.value})")
+            return job
+
+        job_queue.put(job.id)
+        job_queue.publish(job)
+        logger.info(f"Job {job.id} ({job.kind}) queued for session {job.session_id}")
+        return job
@@ -0,0 +1,75 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Set
+
+from src.broker.job import Job, TERMINAL_STATUSES
+from src.broker.store import MemoryJobStore, SQLiteJobStore
+from src.configs.env import JOB_BACKEND, JOB_DB_PATH, JOB_MAX_JOBS, JOB_POLL_INTERVAL
+
+FINISHED = {status.value for status in TERMINAL_STATUSES}
+
+
+class JobQueue:
+    """
+    Ready queue of job ids plus status fan-out.
+
+    Jobs themselves live in the store; the queue only carries ids, so a job
+    re-queued after a restart and one queued just now look the same to
+    consumers. Status changes made in this process are pushed to watchers
+    immediately; the store is polled as well so a watcher also sees jobs
+    finished by another worker process sharing a SQLite store.
+    """
+
+    def __init__(self, store, poll_interval: float = 2.0):
+        self.store = store
+        self.poll_interval = poll_interval
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._watchers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def put(self, job_id: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, job_id)
+        else:
+            self._ready.put_nowait(job_id)
+
+    async def get(self) -> str:
+        return await self._ready.get()
+
+    def publish(self, job: Job) -> None:
+        for watcher in self._watchers.get(job.id, ()):
+            watcher.put_nowait(job.view())
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's status now and on every change until it finishes."""
+        watcher: asyncio.Queue = asyncio.Queue()
+        self._watchers[job_id].add(watcher)
+        try:
+            job = await self.store.get(job_id)
+            if job is None:
+                return
+            view = job.view()
+            yield view
+            while view["status"] not in FINISHED:
+                try:
+                    update = await asyncio.wait_for(watcher.get(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    job = await self.store.get(job_id)
+                    if job is None:
+                        return
+                    update = job.view()
+                if (update["status"], update["attempts"]) != (view["status"], view["attempts"]):
+                    view = update
+                    yield view
+        finally:
+            self._watchers[job_id].discard(watcher)
+            if not self._watchers[job_id]:
+                del self._watchers[job_id]
+
+    def depth(self) -> int:
+        return self._ready.qsize()
+
+
+job_queue = JobQueue(
+    SQLiteJobStore(JOB_DB_PATH) if JOB_BACKEND == "sqlite" else MemoryJobStore(JOB_MAX_JOBS),
+    poll_interval=JOB_POLL_INTERVAL,
+)
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import orjson
+
+from src.broker.job import Job, JobStatus
+
+
+class MemoryJobStore:
+    """Jobs kept in process memory; finished jobs beyond `max_jobs` are forgotten oldest first."""
+
+    def __init__(self, max_jobs: int = 10000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._keys: Dict[str, str] = {}
+
+    async def add(self, job: Job) -> Job:
+        """Store `job`, or return the existing job that still holds its idempotency key."""
+        if job.idempotency_key and job.idempotency_key in self._keys:
+            existing = self._jobs.get(self._keys[job.idempotency_key])
+            if existing is not None and existing.holds_key:
+                return existing
+        self._jobs[job.id] = job
+        if job.idempotency_key:
+            self._keys[job.idempotency_key] = job.id
+        self._evict()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def claim(self, job_id: str) -> Optional[Job]:
+        """Move a queued job to running and count the attempt; None if someone else has it."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status != JobStatus.QUEUED:
+            return None
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.updated_at = time.time()
+        return job
+
+    async def save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        if job.finished:
+            job.payload = {}
+        self._jobs[job.id] = job
+
+    async def recoverable(self) -> List[Job]:
+        return [j for j in self._jobs.values() if not j.finished]
+
+    def _evict(self) -> None:
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [i for i, j in self._jobs.items() if j.finished][:len(self._jobs) - self.max_jobs]:
+            job = self._jobs.pop(job_id)
+            if job.idempotency_key and self._keys.get(job.idempotency_key) == job_id:
+                del self._keys[job.idempotency_key]
+
+
+class SQLiteJobStore:
+    """
+    Durable jobs in a SQLite file shared by every worker on the host.
+
+    Claiming is a conditional UPDATE, so when several processes recover the
+    same queued job only one of them runs it. Payloads are cleared once a
+    job finishes so booking details do not linger on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, status TEXT NOT NULL, "
+                "body BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _encode(job: Job) -> bytes:
+        return orjson.dumps({**job.view(), "payload": job.payload})
+
+    @staticmethod
+    def _decode(body: bytes) -> Job:
+        data = orjson.loads(body)
+        data["status"] = JobStatus(data["status"])
+        return Job(**data)
+
+    def _row(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute("SELECT body FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def _add(self, job: Job) -> Job:
+        with self._lock:
+            conn = self._connection()
+            while True:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (id, idempotency_key, status, body, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job.id, job.idempotency_key, job.status.value, self._encode(job), job.updated_at),
+                )
+                if cursor.rowcount:
+                    return job
+                row = conn.execute(
+                    "SELECT body FROM jobs WHERE idempotency_key = ?", (job.idempotency_key,)
+                ).fetchone()
+                if row is None:
+                    continue
+                existing = self._decode(row[0])
+                if existing.holds_key:
+                    return existing
+                # The failed job gives its key up; the row stays for inspection.
+                conn.execute("UPDATE jobs SET idempotency_key = NULL WHERE id = ?", (existing.id,))
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._row(job_id)
+
+    def _claim(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status = ?",
+                (JobStatus.RUNNING.value, job_id, JobStatus.QUEUED.value),
+            )
+            if not cursor.rowcount:
+                return None
+            job = self._row(job_id)
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.updated_at = time.time()
+            conn.execute(
+                "UPDATE jobs SET body = ?, updated_at = ? WHERE id = ?",
+                (self._encode(job), job.updated_at, job.id),
+            )
+        return job
+
+    def _save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        if job.finished:
+            job.payload = {}
+        with self._lock:
+            self._connection().execute(
+                "UPDATE jobs SET status = ?, body = ?, updated_at = ? WHERE id = ?",
+                (job.status.value, self._encode(job), job.updated_at, job.id),
+            )
+
+    def _recoverable(self) -> List[Job]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT body FROM jobs WHERE status IN (?, ?) ORDER BY updated_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [self._decode(body) for body, in rows]
+
+    async def add(self, job: Job) -> Job:
+        return await asyncio.to_thread(self._add, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def claim(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._claim, job_id)
+
+    async def save(self, job: Job) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def recoverable(self) -> List[Job]:
+        return await asyncio.to_thread(self._recoverable)
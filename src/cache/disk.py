@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+
+from src.configs.metrics import registry
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+class DiskCache:
+    """
+    Persistent key/value cache backed by a SQLite file.
+
+    The file is opened in WAL mode, so every worker process on the host shares
+    the same entries and they survive restarts. Each key carries its own
+    expiry; expired rows are ignored on read and deleted by a background
+    purge task. SQLite calls run in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, *, name: str, path: str, ttl: float, purge_interval: float = 600.0):
+        self.name = name
+        self.path = path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._purger: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        registry.collect("agent_cache", self.stats, cache=name)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT value FROM {self.name} WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._connection().execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+
+    def _purge(self) -> int:
+        with self._lock:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self.name} WHERE expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await asyncio.to_thread(self._get, key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._set, key, orjson.dumps(value), self.ttl if ttl is None else ttl)
+
+    async def purge(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        return await asyncio.to_thread(self._purge)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, calling `fetch` and storing its result on a miss."""
+        self._ensure_purger()
+
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await fetch()
+        await self.set(key, value)
+        return value
+
+    def _ensure_purger(self) -> None:
+        if self._purger is not None and not self._purger.done():
+            return
+
+        async def purge_forever():
+            while True:
+                await asyncio.sleep(self.purge_interval)
+                try:
+                    removed = await self.purge()
+                    if removed:
+                        logger.info(f"{self.name} cache purged {removed} expired entries")
+                except Exception as e:
+                    logger.warning(f"{self.name} cache purge failed: {e}")
+
+        self._purger = asyncio.create_task(purge_forever())
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
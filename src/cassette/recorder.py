@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+from uuid import UUID
+
+import httpx
+import orjson
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.configs.env import CASSETTE_DIR
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+REDACTED = "[REDACTED]"
+# Fields holding credentials or traveller/payment details, redacted wherever they appear.
+SENSITIVE_KEYS = {
+    "access_token", "client_id", "client_secret", "authorization",
+    "firstName", "lastName", "dateOfBirth", "emailAddress", "email", "phone", "phones",
+    "documents", "cardNumber", "holderName", "expiryDate", "paymentCard",
+}
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_DIGITS = re.compile(r"\b(?:\d[ -]?){9,}\b")
+
+
+def redact(value: Any) -> Any:
+    """Copy of `value` with sensitive fields masked and e-mails/long digit runs scrubbed from text."""
+    if isinstance(value, dict):
+        return {k: REDACTED if k in SENSITIVE_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    if isinstance(value, str):
+        return _DIGITS.sub(REDACTED, _EMAIL.sub(REDACTED, value))
+    return value
+
+
+def request_key(method: str, path: str, params: List[List[str]], body: Any) -> str:
+    """Match key for an HTTP exchange; computed on redacted data so record and replay agree."""
+    digest = hashlib.sha1(orjson.dumps(body, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16] if body else ""
+    query = "&".join(f"{k}={v}" for k, v in sorted(map(tuple, params)))
+    return f"{method} {path}?{query} {digest}"
+
+
+def describe_request(request: httpx.Request) -> Dict[str, Any]:
+    """Method, path, params and (redacted, JSON only) body of an outgoing request."""
+    body = None
+    if request.headers.get("content-type", "").startswith("application/json") and request.content:
+        body = redact(orjson.loads(request.content))
+    params = sorted([k, REDACTED if k in SENSITIVE_KEYS else v] for k, v in parse_qsl(request.url.query.decode()))
+    return {
+        "method": request.method,
+        "path": request.url.path,
+        "params": params,
+        "body": body,
+        "key": request_key(request.method, request.url.path, params, body),
+    }
+
+
+def _safe_name(session_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)[:128] or "default"
+
+
+class Cassette:
+    """
+    Records one chat turn: the prompt, every model call and every upstream
+    HTTP exchange made on its behalf, appended as JSON lines to
+    `<CASSETTE_DIR>/<session_id>.jsonl` when the turn ends.
+    """
+
+    def __init__(self, session_id: str, prompt: str, directory: str = CASSETTE_DIR):
+        self.session_id = session_id
+        self.path = os.path.join(directory, f"{_safe_name(session_id)}.jsonl")
+        self.started = time.perf_counter()
+        self.first_token_ms: Optional[float] = None
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.records: List[Dict[str, Any]] = [{
+            "type": "turn",
+            "session_id": session_id,
+            "prompt": redact(prompt),
+            "at": time.time(),
+        }]
+        self.callback = _LLMRecorder(self)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark_first_token(self) -> None:
+        if self.first_token_ms is None:
+            self.first_token_ms = self.elapsed_ms()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+    def _write(self, payload: bytes) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(payload)
+
+    async def close(self, error: Optional[str] = None) -> None:
+        self.add({
+            "type": "turn_end",
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+            "elapsed_ms": round(self.elapsed_ms(), 1),
+            "first_token_ms": self.first_token_ms and round(self.first_token_ms, 1),
+            "error": error,
+        })
+        payload = b"".join(orjson.dumps(r) + b"\n" for r in self.records)
+        try:
+            await asyncio.to_thread(self._write, payload)
+        except OSError as e:
+            logger.warning(f"Could not write cassette {self.path}: {e}")
+
+
+class _LLMRecorder(AsyncCallbackHandler):
+    """Captures each chat-model call of the turn with its latency and parsed response."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        batch = messages[0] if messages else []
+        self._runs[run_id] = {
+            "started": time.perf_counter(),
+            "first_token_ms": None,
+            "messages": len(batch),
+            "last": batch[-1].type if batch else None,
+        }
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        run = self._runs.get(run_id)
+        if run and run["first_token_ms"] is None:
+            run["first_token_ms"] = round((time.perf_counter() - run["started"]) * 1000, 1)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        run = self._runs.pop(run_id, None) or {"started": time.perf_counter(), "first_token_ms": None}
+        message = response.generations[0][0].message
+        content = message.content if isinstance(message.content, str) else orjson.loads(orjson.dumps(message.content))
+        self.cassette.llm_calls += 1
+        self.cassette.add({
+            "type": "llm",
+            "request": {"messages": run.get("messages"), "last": run.get("last")},
+            "content": redact(content),
+            "tool_calls": [
+                {"name": c["name"], "args": redact(c["args"]), "id": c["id"]}
+                for c in getattr(message, "tool_calls", [])
+            ],
+            "usage": getattr(message, "usage_metadata", None),
+            "first_token_ms": run["first_token_ms"],
+            "elapsed_ms": round((time.perf_counter() - run["started"]) * 1000, 1),
+        })
+
+
+# The cassette of the turn running in this context; tools and HTTP calls inherit it.
+active_cassette: ContextVar[Optional[Cassette]] = ContextVar("active_cassette", default=None)
+
+
+async def record_exchange(response: httpx.Response) -> None:
+    """httpx response hook: append the exchange to the active cassette, if any."""
+    cassette = active_cassette.get()
+    if cassette is None:
+        return
+    await response.aread()
+    try:
+        body = redact(orjson.loads(response.content)) if response.content else None
+    except orjson.JSONDecodeError:
+        body = None
+    cassette.add({
+        "type": "http",
+        **describe_request(response.request),
+        "status": response.status_code,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() == "retry-after"},
+        "response": body,
+        "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+    })
+
+
+@asynccontextmanager
+async def recording(session_id: str, prompt: str, enabled: bool):
+    """Record the enclosed turn to a cassette when `enabled`; yields the Cassette or None."""
+    if not enabled:
+        yield None
+        return
+
+    cassette = Cassette(session_id, prompt)
+    token = active_cassette.set(cassette)
+    error = None
+    try:
+        yield cassette
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            active_cassette.reset(token)
+        except ValueError:
+            pass  # generator closed from another context after a client disconnect
+        await cassette.close(error)
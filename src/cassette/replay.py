@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+import orjson
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.cassette.recorder import describe_request
+
+
+class CassetteMismatch(AssertionError):
+    """The replayed turn asked for something the cassette does not contain."""
+
+
+@dataclass
+class Turn:
+    session_id: str
+    prompt: str
+    llm: List[Dict[str, Any]] = field(default_factory=list)
+    http: List[Dict[str, Any]] = field(default_factory=list)
+    end: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TurnResult:
+    prompt: str
+    expected_llm_calls: int
+    llm_calls: int
+    expected_tool_calls: int
+    tool_calls: int
+    recorded_ms: Optional[float]
+    elapsed_ms: float
+    first_token_ms: Optional[float]
+    http_misses: int
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.error is None
+            and self.llm_calls == self.expected_llm_calls
+            and self.tool_calls == self.expected_tool_calls
+        )
+
+
+def load(path: str) -> List[Turn]:
+    """Group a cassette's JSON lines into turns."""
+    turns: List[Turn] = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            kind = record["type"]
+            if kind == "turn":
+                turns.append(Turn(session_id=record["session_id"], prompt=record["prompt"]))
+            elif not turns:
+                raise CassetteMismatch(f"{path}: '{kind}' record before any turn")
+            elif kind == "llm":
+                turns[-1].llm.append(record)
+            elif kind == "http":
+                turns[-1].http.append(record)
+            elif kind == "turn_end":
+                turns[-1].end = record
+    return turns
+
+
+class ReplayChatModel(BaseChatModel):
+    """Answers with the recorded model responses, in order; optionally at recorded speed."""
+    responses: List[Dict[str, Any]]
+    pace: bool = False
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next(self) -> Dict[str, Any]:
+        if self.calls >= len(self.responses):
+            raise CassetteMismatch(f"model called {self.calls + 1} times; cassette has {len(self.responses)}")
+        record = self.responses[self.calls]
+        self.calls += 1
+        return record
+
+    @staticmethod
+    def _message(record: Dict[str, Any]) -> AIMessage:
+        return AIMessage(
+            content=record["content"],
+            tool_calls=[{**c, "type": "tool_call"} for c in record["tool_calls"]],
+            usage_metadata=record.get("usage"),
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._message(self._next()))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        record = self._next()
+        first = (record.get("first_token_ms") or record.get("elapsed_ms") or 0) / 1000
+        if self.pace:
+            await asyncio.sleep(first)
+
+        if record["tool_calls"] or not isinstance(record["content"], str):
+            message = self._message(record)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=message.content,
+                tool_call_chunks=[
+                    {"name": c["name"], "args": orjson.dumps(c["args"]).decode(), "id": c["id"], "index": i}
+                    for i, c in enumerate(record["tool_calls"])
+                ],
+                usage_metadata=record.get("usage"),
+            ))
+            return
+
+        words = record["content"].split(" ")
+        gap = max(0.0, (record.get("elapsed_ms") or 0) / 1000 - first) / max(len(words), 1)
+        for i, word in enumerate(words):
+            if self.pace and i:
+                await asyncio.sleep(gap)
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word if last else word + " ",
+                usage_metadata=record.get("usage") if last else None,
+            ))
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves upstream calls from recorded exchanges matched on method, path, params and body."""
+
+    def __init__(self, exchanges: List[Dict[str, Any]], pace: bool = False):
+        self.pace = pace
+        self._exchanges: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        for exchange in exchanges:
+            self._exchanges[exchange["key"]].append(exchange)
+        self.misses: List[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = describe_request(request)["key"]
+        queue = self._exchanges.get(key)
+        if not queue:
+            if request.url.path.endswith("/oauth2/token"):
+                return httpx.Response(200, json={"access_token": "replay", "expires_in": 1799})
+            self.misses.append(key)
+            return httpx.Response(404, json={"errors": [{"title": "NOT IN CASSETTE", "detail": key}]})
+
+        # The last recording of a request is reused if it repeats more often than recorded.
+        exchange = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.pace:
+            await asyncio.sleep(exchange["elapsed_ms"] / 1000)
+        content = orjson.dumps(exchange["response"]) if exchange["response"] is not None else b""
+        headers = {**exchange.get("headers", {}), "content-type": "application/json"}
+        return httpx.Response(exchange["status"], headers=headers, content=content)
+
+
+async def replay(path: str, pace: bool = False) -> List[TurnResult]:
+    """
+    Re-run every turn of a cassette offline through the real agent and tools.
+
+    The model is replaced by the recorded responses and AsyncHTTPRequest by
+    the recorded exchanges, so a turn is deterministic; it is measured and
+    its model and tool call counts are compared with the recording.
+    """
+    from src.configs.http import AsyncHTTPRequest
+    from src.llm.agent import use_model
+    from src.llm.core import stream_response
+
+    turns = load(path)
+    model = ReplayChatModel(responses=[r for t in turns for r in t.llm], pace=pace)
+    transport = ReplayTransport([h for t in turns for h in t.http], pace=pace)
+    use_model(model)
+    await AsyncHTTPRequest.shutdown()
+    AsyncHTTPRequest._client = httpx.AsyncClient(transport=transport)
+
+    results = []
+    try:
+        for turn in turns:
+            calls_before, misses_before = model.calls, len(transport.misses)
+            tool_calls, first_token, error = 0, None, None
+            started = time.perf_counter()
+            try:
+                async for frame in stream_response(turn.prompt, turn.session_id):
+                    event = frame.split("\n", 1)[0][len("event: "):]
+                    if event == "delta" and first_token is None:
+                        first_token = (time.perf_counter() - started) * 1000
+                    elif event == "tool_end":
+                        tool_calls += 1
+                    elif event == "error":
+                        error = orjson.loads(frame.split("data: ", 1)[1])["message"]
+            except CassetteMismatch as e:
+                error = str(e)
+            results.append(TurnResult(
+                prompt=turn.prompt,
+                expected_llm_calls=turn.end.get("llm_calls", len(turn.llm)),
+                llm_calls=model.calls - calls_before,
+                expected_tool_calls=turn.end.get("tool_calls", 0),
+                tool_calls=tool_calls,
+                recorded_ms=turn.end.get("elapsed_ms"),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+                first_token_ms=first_token,
+                http_misses=len(transport.misses) - misses_before,
+                error=error,
+            ))
+    finally:
+        await AsyncHTTPRequest.shutdown()
+    return results
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Dict
+
+from src.configs.env import ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUED, ADMISSION_QUEUE_TIMEOUT
+from src.configs.metrics import ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Longest Retry-After hint handed to rejected clients, in seconds.
+MAX_RETRY_AFTER = 60
+
+
+class Overloaded(Exception):
+    """Raised when a chat turn cannot be admitted; `retry_after` is a hint in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server is busy ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted turn. Release it once the turn's response is over; releasing twice is a no-op."""
+
+    __slots__ = ("_control", "session_id", "admitted_at", "_released")
+
+    def __init__(self, control: "AdmissionControl", session_id: str):
+        self._control = control
+        self.session_id = session_id
+        self.admitted_at = time.perf_counter()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._control._release(self)
+
+
+class AdmissionControl:
+    """
+    Admits chat turns before any model or upstream work starts.
+
+    At most `max_active` turns run at once and each session runs one turn
+    at a time; later messages of a busy session wait for the earlier one.
+    Waiting turns form a bounded queue: when it is full, or a turn has
+    waited `queue_timeout` seconds, the turn is rejected with `Overloaded`
+    so the client can retry instead of every turn slowing down together.
+    """
+
+    def __init__(self, max_active: int = 32, max_queued: int = 64, queue_timeout: float = 10.0):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_active)
+        self._sessions: Dict[str, asyncio.Lock] = {}
+        self._holders: Dict[str, int] = {}
+        self._active = 0
+        self._queued = 0
+        # Moving average of how long a turn holds its slot, for Retry-After hints.
+        self._turn_seconds = 5.0
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        if session_id not in self._sessions:
+            self._sessions[session_id] = asyncio.Lock()
+            self._holders[session_id] = 0
+        self._holders[session_id] += 1
+        return self._sessions[session_id]
+
+    def _forget(self, session_id: str) -> None:
+        self._holders[session_id] -= 1
+        if not self._holders[session_id]:
+            del self._holders[session_id]
+            del self._sessions[session_id]
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new turn has likely drained."""
+        estimate = (self._queued + 1) * self._turn_seconds / self.max_active
+        return math.ceil(min(max(estimate, 1.0), MAX_RETRY_AFTER))
+
+    def _reject(self, session_id: str, reason: str) -> Overloaded:
+        self._forget(session_id)
+        ADMISSION_REJECTED.inc(reason)
+        error = Overloaded(reason, self.retry_after())
+        logger.warning(f"Rejected turn for session {session_id}: {reason} ({self._active} active, {self._queued} queued)")
+        return error
+
+    async def _acquire(self, lock: asyncio.Lock) -> None:
+        await lock.acquire()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            lock.release()
+            raise
+
+    async def admit(self, session_id: str) -> Ticket:
+        """Wait for a slot for one turn of `session_id`; raises `Overloaded` when the turn is shed."""
+        lock = self._session_lock(session_id)
+        started = time.perf_counter()
+        if not lock.locked() and not self._slots.locked():
+            # Both are free, so this acquires without suspending and no other turn can slip in between.
+            await self._acquire(lock)
+        else:
+            if self._queued >= self.max_queued:
+                raise self._reject(session_id, "queue_full")
+            self._queued += 1
+            try:
+                await asyncio.wait_for(self._acquire(lock), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(session_id, "timeout")
+            except BaseException:
+                self._forget(session_id)
+                raise
+            finally:
+                self._queued -= 1
+
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started)
+        self._active += 1
+        return Ticket(self, session_id)
+
+    def _release(self, ticket: Ticket) -> None:
+        self._turn_seconds = 0.8 * self._turn_seconds + 0.2 * (time.perf_counter() - ticket.admitted_at)
+        self._active -= 1
+        self._slots.release()
+        self._sessions[ticket.session_id].release()
+        self._forget(ticket.session_id)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "sessions": len(self._sessions),
+            "turn_seconds_avg": round(self._turn_seconds, 3),
+        }
+
+
+admission = AdmissionControl(ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUED, ADMISSION_QUEUE_TIMEOUT)
+registry.collect("agent_admission", admission.stats)
@@ -8,3 +8,107 @@ GEMINI_API_KEY = str(os.getenv('GEMINI_API_KEY'))
 AMADEUS_BASE_URL = str(os.getenv('AMADEUS_BASE_URL'))
 AMADEUS_CLIENT_ID = str(os.getenv('AMADEUS_CLIENT_ID'))
 AMADEUS_CLIENT_SECRET = str(os.getenv('AMADEUS_CLIENT_SECRET'))
+
+# Seconds before `expires_in` at which a cached Amadeus token is refreshed.
+AMADEUS_TOKEN_REFRESH_MARGIN = float(os.getenv('AMADEUS_TOKEN_REFRESH_MARGIN', '60'))
+
+# Flight search result cache (seconds / entries / bytes).
+FLIGHT_OFFERS_CACHE_TTL = float(os.getenv('FLIGHT_OFFERS_CACHE_TTL', '300'))
+FLIGHT_DESTINATIONS_CACHE_TTL = float(os.getenv('FLIGHT_DESTINATIONS_CACHE_TTL', '3600'))
+FLIGHT_CACHE_STALE_TTL = float(os.getenv('FLIGHT_CACHE_STALE_TTL', '120'))
+FLIGHT_CACHE_MAX_ENTRIES = int(os.getenv('FLIGHT_CACHE_MAX_ENTRIES', '256'))
+FLIGHT_CACHE_MAX_BYTES = int(os.getenv('FLIGHT_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# Persistent hotel reference-data cache shared by all workers on the host.
+HOTEL_CACHE_PATH = os.getenv('HOTEL_CACHE_PATH', '.cache/amadeus.sqlite3')
+HOTEL_REFERENCE_CACHE_TTL = float(os.getenv('HOTEL_REFERENCE_CACHE_TTL', '86400'))
+CACHE_PURGE_INTERVAL = float(os.getenv('CACHE_PURGE_INTERVAL', '600'))
+
+# Upstream scheduling. Amadeus quotas are per second; endpoint overrides are
+# given as "path=rate" pairs, e.g. "/v2/shopping/flight-offers=5".
+AMADEUS_RATE_LIMIT = float(os.getenv('AMADEUS_RATE_LIMIT', '10'))
+AMADEUS_ENDPOINT_RATE_LIMITS = {
+    path.strip(): float(rate)
+    for path, _, rate in (
+        item.partition('=') for item in os.getenv('AMADEUS_ENDPOINT_RATE_LIMITS', '').split(',') if item
+    )
+}
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.5'))
+HTTP_BACKOFF_CAP = float(os.getenv('HTTP_BACKOFF_CAP', '8'))
+HTTP_RETRY_BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', '0.2'))
+
+# Shared HTTP client: pool sizes, per-phase timeouts (seconds), HTTP/2 and prewarming.
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '50'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+HTTP_WRITE_TIMEOUT = float(os.getenv('HTTP_WRITE_TIMEOUT', '10'))
+HTTP_POOL_TIMEOUT = float(os.getenv('HTTP_POOL_TIMEOUT', '5'))
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'true').lower() == 'true'
+HTTP_PREWARM_CONNECTIONS = int(os.getenv('HTTP_PREWARM_CONNECTIONS', '1'))
+
+# Server-side conversation store: "memory" or "sqlite".
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory').lower()
+SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', '.cache/sessions.sqlite3')
+SESSION_MAX_SESSIONS = int(os.getenv('SESSION_MAX_SESSIONS', '1024'))
+SESSION_HISTORY_LIMIT = int(os.getenv('SESSION_HISTORY_LIMIT', '40'))
+
+# Estimated tokens of history sent per turn; older turns are folded into a travel-facts summary.
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '4000'))
+CONTEXT_MESSAGE_MAX_TOKENS = int(os.getenv('CONTEXT_MESSAGE_MAX_TOKENS', '1500'))
+CONTEXT_COLD_LOAD_MESSAGES = int(os.getenv('CONTEXT_COLD_LOAD_MESSAGES', '200'))
+
+# Largest accepted (decompressed) chat request body, in bytes.
+CHAT_MAX_BODY_BYTES = int(os.getenv('CHAT_MAX_BODY_BYTES', str(256 * 1024)))
+
+# How often a stream waiting on the agent checks whether its client is still connected, in seconds.
+SSE_DISCONNECT_POLL_INTERVAL = float(os.getenv('SSE_DISCONNECT_POLL_INTERVAL', '1'))
+
+# Chat turns running at once, turns allowed to wait for a slot, and the longest wait in seconds.
+ADMISSION_MAX_ACTIVE = int(os.getenv('ADMISSION_MAX_ACTIVE', '32'))
+ADMISSION_MAX_QUEUED = int(os.getenv('ADMISSION_MAX_QUEUED', '64'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '10'))
+
+# Full flight offers kept server-side behind the compact rows sent to the model.
+FLIGHT_OFFER_STORE_TTL = float(os.getenv('FLIGHT_OFFER_STORE_TTL', '1800'))
+FLIGHT_OFFER_STORE_MAX_ENTRIES = int(os.getenv('FLIGHT_OFFER_STORE_MAX_ENTRIES', '20000'))
+# Offers fetched per flight search; the agent filters and ranks this page locally.
+FLIGHT_SEARCH_FETCH_MAX = int(os.getenv('FLIGHT_SEARCH_FETCH_MAX', '50'))
+# Flexible-date searches: widest ±day window, day searches in flight at once, and day searches per call.
+FLIGHT_FLEX_MAX_DAYS = int(os.getenv('FLIGHT_FLEX_MAX_DAYS', '7'))
+FLIGHT_FLEX_CONCURRENCY = int(os.getenv('FLIGHT_FLEX_CONCURRENCY', '4'))
+FLIGHT_FLEX_MAX_SEARCHES = int(os.getenv('FLIGHT_FLEX_MAX_SEARCHES', '15'))
+
+# Tool calls issued in one model turn run concurrently within these bounds.
+TOOL_CONCURRENCY_GLOBAL = int(os.getenv('TOOL_CONCURRENCY_GLOBAL', '32'))
+TOOL_CONCURRENCY_PER_SESSION = int(os.getenv('TOOL_CONCURRENCY_PER_SESSION', '4'))
+TOOL_CALL_TIMEOUT = float(os.getenv('TOOL_CALL_TIMEOUT', '30'))
+
+# Gemini model used by the agent; AGENT_WARMUP builds it in the background at startup
+# instead of on the first chat request.
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+AGENT_WARMUP = os.getenv('AGENT_WARMUP', 'true').lower() == 'true'
+
+# Background job queue for bookings: "memory" or "sqlite" (durable, shared by workers on the host).
+JOB_BACKEND = os.getenv('JOB_BACKEND', 'memory').lower()
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', '.cache/jobs.sqlite3')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_BASE = float(os.getenv('JOB_RETRY_BASE', '2'))
+JOB_RETRY_CAP = float(os.getenv('JOB_RETRY_CAP', '60'))
+JOB_MAX_JOBS = int(os.getenv('JOB_MAX_JOBS', '10000'))
+JOB_STALE_AFTER = float(os.getenv('JOB_STALE_AFTER', '600'))
+# How often running jobs are checked against JOB_STALE_AFTER, in seconds.
+JOB_SWEEP_INTERVAL = float(os.getenv('JOB_SWEEP_INTERVAL', '60'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+JOB_SHUTDOWN_GRACE = float(os.getenv('JOB_SHUTDOWN_GRACE', '30'))
+
+# Record chat turns (model calls + upstream HTTP, redacted) as JSONL cassettes: "off" or "record".
+CASSETTE_MODE = os.getenv('CASSETTE_MODE', 'off').lower()
+CASSETTE_DIR = os.getenv('CASSETTE_DIR', 'cassettes')
+
+# Emit OpenTelemetry spans per chat turn, model call, tool call and upstream request
+# (needs opentelemetry-api plus an SDK/exporter configured in the process).
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
@@ -1,6 +1,55 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import time
 import httpx
+import orjson
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+from src.configs.env import (
+    AMADEUS_BASE_URL,
+    AMADEUS_RATE_LIMIT,
+    AMADEUS_ENDPOINT_RATE_LIMITS,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_CAP,
+    HTTP_RETRY_BUDGET_RATIO,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_WRITE_TIMEOUT,
+    HTTP_POOL_TIMEOUT,
+    HTTP2_ENABLED,
+    HTTP_PREWARM_CONNECTIONS,
+    CASSETTE_MODE,
+)
+from src.configs.metrics import CANCELLED_WORK, UPSTREAM_SECONDS, registry
+from src.configs.tracing import span
+from src.configs.ratelimit import (
+    Priority,
+    RequestScheduler,
+    RetryBudget,
+    backoff_delay,
+    parse_retry_after,
+    request_priority,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Statuses worth retrying; 429 is always safe because the request was rejected unprocessed.
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTION"}
 
 
 class Methods(str, Enum):
@@ -15,17 +64,172 @@ class Methods(str, Enum):
 
 class AsyncHTTPRequest:
     _client: Optional[httpx.AsyncClient] = None
+    _client_lock = asyncio.Lock()
+    # In-flight coalesced GETs, keyed by method, URL, params and auth scope.
+    _inflight: Dict[Tuple, asyncio.Task] = {}
+    _waiters: Dict[asyncio.Task, int] = {}
+    _coalesce_leaders: int = 0
+    _coalesce_collapsed: int = 0
+    _scheduler = RequestScheduler(
+        host_rates={urlsplit(AMADEUS_BASE_URL).netloc: AMADEUS_RATE_LIMIT},
+        endpoint_rates=AMADEUS_ENDPOINT_RATE_LIMITS,
+    )
+    _retry_budget = RetryBudget(ratio=HTTP_RETRY_BUDGET_RATIO)
+
+    @classmethod
+    def _build_client(cls) -> httpx.AsyncClient:
+        http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        if HTTP2_ENABLED and not http2:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT,
+            read=HTTP_READ_TIMEOUT,
+            write=HTTP_WRITE_TIMEOUT,
+            pool=HTTP_POOL_TIMEOUT,
+        )
+        event_hooks = {}
+        if CASSETTE_MODE == "record":
+            from src.cassette.recorder import record_exchange
+            event_hooks["response"] = [record_exchange]
+        return httpx.AsyncClient(timeout=timeout, limits=limits, http2=http2, event_hooks=event_hooks)
 
     @classmethod
     async def get_client(cls) -> httpx.AsyncClient:
         if cls._client is None:
-            limits = httpx.Limits(
-                max_connections=50,
-                max_keepalive_connections=20,
-            )
-            cls._client = httpx.AsyncClient(timeout=30.0, limits=limits)
+            async with cls._client_lock:
+                if cls._client is None:
+                    cls._client = cls._build_client()
         return cls._client
 
+    @classmethod
+    async def startup(cls) -> None:
+        """Create the shared client and optionally open connections to Amadeus ahead of traffic."""
+        client = await cls.get_client()
+        if HTTP_PREWARM_CONNECTIONS <= 0 or not AMADEUS_BASE_URL.startswith("http"):
+            return
+
+        async def warm():
+            try:
+                await client.head(AMADEUS_BASE_URL)
+            except httpx.HTTPError as e:
+                logger.warning(f"Connection prewarm to {AMADEUS_BASE_URL} failed: {e!r}")
+
+        await asyncio.gather(*(warm() for _ in range(HTTP_PREWARM_CONNECTIONS)))
+        logger.info(f"Prewarmed connections to {AMADEUS_BASE_URL}: {cls.pool_stats()}")
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        async with cls._client_lock:
+            if cls._client is not None:
+                await cls._client.aclose()
+                cls._client = None
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, int]:
+        """In-use, idle and waiting counts for the connection pool (zeros before startup)."""
+        stats = {"connections": 0, "in_use": 0, "idle": 0, "waiting": 0}
+        # httpx does not expose pool state publicly; read httpcore's pool defensively.
+        pool = getattr(getattr(cls._client, "_transport", None), "_pool", None)
+        if pool is None:
+            return stats
+
+        for connection in getattr(pool, "connections", []):
+            stats["connections"] += 1
+            if connection.is_idle():
+                stats["idle"] += 1
+            else:
+                stats["in_use"] += 1
+        stats["waiting"] = sum(1 for r in getattr(pool, "_requests", []) if r.is_queued())
+        return stats
+
+    @staticmethod
+    def _coalesce_key(
+        url: str,
+        method: Methods,
+        params: Dict[str, Any] | None,
+        headers: Dict[str, str] | None,
+    ) -> Tuple:
+        authorization = (headers or {}).get("Authorization", "")
+        scope = hashlib.sha256(authorization.encode()).hexdigest() if authorization else ""
+        normalized = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        return method.value, url, normalized, scope
+
+    @classmethod
+    async def _send(
+        cls,
+        *,
+        url: str,
+        method: Methods,
+        params: Dict[str, Any] | None = None,
+        json: Dict[str, Any] | None = None,
+        content: bytes | None = None,
+        data: Dict[str, Any] | None = None,
+        headers: Dict[str, str] | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> bytes:
+        client = await cls.get_client()
+        verb = method.value.upper()
+        parts = urlsplit(url)
+        cls._retry_budget.record_request()
+
+        with span(f"{verb} {parts.path}", **{"http.request.method": verb, "server.address": parts.netloc}):
+            attempt = 0
+            while True:
+                await cls._scheduler.acquire(parts.netloc, parts.path, priority)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        verb,
+                        url,
+                        params=params,
+                        json=json,
+                        content=content,
+                        data=data,
+                        headers=headers,
+                    )
+                except asyncio.CancelledError:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - started, verb, parts.path, "cancelled")
+                    CANCELLED_WORK.inc("upstream")
+                    raise
+                except httpx.TransportError as e:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - started, verb, parts.path, "error")
+                    # A failed connect never reached the server; other transport errors only retry when idempotent.
+                    sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                    if (sent and verb not in IDEMPOTENT_METHODS) or not cls._can_retry(attempt):
+                        raise
+                    delay = backoff_delay(attempt, HTTP_BACKOFF_BASE, HTTP_BACKOFF_CAP)
+                    logger.warning(f"{verb} {parts.path} transport error ({e!r}), retrying in {delay:.2f}s")
+                else:
+                    status = response.status_code
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - started, verb, parts.path, str(status))
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    retryable = status == 429 or (status in RETRY_STATUSES and verb in IDEMPOTENT_METHODS)
+                    # A server asking for a longer pause than we ever back off fails the call instead of parking it.
+                    if retry_after is not None and retry_after > HTTP_BACKOFF_CAP:
+                        retryable = False
+                    if not (retryable and cls._can_retry(attempt)):
+                        try:
+                            response.raise_for_status()
+                        except httpx.HTTPStatusError:
+                            logger.warning(f"{verb} {parts.path} failed with {status}: {response.text[:500]}")
+                            raise
+                        return response.content
+                    delay = backoff_delay(attempt, HTTP_BACKOFF_BASE, HTTP_BACKOFF_CAP, retry_after)
+                    logger.warning(f"{verb} {parts.path} returned {status}, retrying in {delay:.2f}s")
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    @classmethod
+    def _can_retry(cls, attempt: int) -> bool:
+        return attempt < HTTP_MAX_RETRIES and cls._retry_budget.try_spend()
+
     @classmethod
     async def request(
         cls,
@@ -34,22 +238,101 @@ class AsyncHTTPRequest:
         method: Methods,
         params: Dict[str, Any] | None = None,
         json: Dict[str, Any] | None = None,
+        content: bytes | None = None,
+        data: Dict[str, Any] | None = None,
         headers: Dict[str, str] | None = None,
+        coalesce: bool = False,
+        priority: Priority | None = None,
     ):
-        client = await cls.get_client()
+        """
+        Send a request and return the decoded JSON body.
 
-        response = await client.request(
-            method.value.upper(),
-            url,
-            params=params,
-            json=json,
-            headers=headers,
-        )
+        Calls are admitted by the rate-limit scheduler in `priority` order
+        (defaulting to the caller's `request_priority` context) and 429/5xx
+        responses are retried with jittered backoff within the retry budget.
+
+        Pre-encoded JSON bodies (see `src.schemas.serialization.dump_json`) are
+        passed as `content` bytes so they are not encoded a second time.
+
+        With `coalesce=True`, concurrent identical GETs share one upstream call;
+        every caller decodes its own copy of the shared response body. The call
+        is cancelled only once every caller sharing it has been cancelled.
+        """
+        if priority is None:
+            priority = request_priority.get()
+
+        if not (coalesce and method == Methods.GET):
+            body = await cls._send(
+                url=url,
+                method=method,
+                params=params,
+                json=json,
+                content=content,
+                data=data,
+                headers=headers,
+                priority=priority,
+            )
+            return orjson.loads(body)
+
+        key = cls._coalesce_key(url, method, params, headers)
+        while True:
+            task = cls._inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(
+                    cls._send(url=url, method=method, params=params, headers=headers, priority=priority)
+                )
+                cls._inflight[key] = task
+                task.add_done_callback(lambda t: cls._release(key, t))
+                cls._coalesce_leaders += 1
+            else:
+                cls._coalesce_collapsed += 1
+
+            # Shielded so one cancelled caller does not fail the others sharing the call;
+            # the last caller to give up cancels the upstream call itself.
+            cls._waiters[task] = cls._waiters.get(task, 0) + 1
+            try:
+                body = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not asyncio.current_task().cancelling():
+                    # The shared call was cancelled by its other callers, not this one: issue it again.
+                    continue
+                if cls._waiters[task] == 1 and not task.done():
+                    # Unpublish first so a new caller starts a fresh call instead of joining this one.
+                    if cls._inflight.get(key) is task:
+                        del cls._inflight[key]
+                    task.cancel()
+                raise
+            finally:
+                cls._waiters[task] -= 1
+                if not cls._waiters[task]:
+                    del cls._waiters[task]
+            return orjson.loads(body)
+
+    @classmethod
+    def _release(cls, key: Tuple, task: asyncio.Task) -> None:
+        if cls._inflight.get(key) is task:
+            del cls._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone away
+
+    @classmethod
+    def scheduler_stats(cls) -> Dict[str, float]:
+        """Calls waiting for a rate-limit token and the remaining retry budget."""
+        return {
+            "queued": cls._scheduler.queue_depth(),
+            "retry_budget": cls._retry_budget.tokens,
+        }
+
+    @classmethod
+    def coalesce_stats(cls) -> Dict[str, int]:
+        """Upstream calls made vs. calls collapsed onto an identical in-flight GET."""
+        return {
+            "leaders": cls._coalesce_leaders,
+            "collapsed": cls._coalesce_collapsed,
+            "in_flight": len(cls._inflight),
+        }
 
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError:
-            print("Gemini error response:", response.text)
-            raise
 
-        return response.json()
+registry.collect("agent_http_pool", AsyncHTTPRequest.pool_stats)
+registry.collect("agent_http_scheduler", AsyncHTTPRequest.scheduler_stats)
+registry.collect("agent_http_coalesce", AsyncHTTPRequest.coalesce_stats)
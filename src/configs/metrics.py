@@ -0,0 +1,257 @@
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Seconds; spans sub-10ms cache hits up to the tool timeout.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, values: Sequence[str]) -> LabelValues:
+        if len(values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(values)}")
+        return tuple(str(v) for v in values)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count, one series per label combination."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that goes up and down (in-flight work, queue depth)."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with sum and count, as Prometheus expects."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [count per bucket..., count above the last bucket], sum.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][slot] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._series.items()]
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            suffix = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus registry rendered in the text exposition format.
+
+    Metrics are created once at import time by the modules that update them.
+    Components that already keep their own counters (caches, pools, queues)
+    register a `stats()` callable instead; it is read on every scrape and its
+    keys exported as gauges named `<prefix>_<key>`.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Tuple[str, Callable[[], Mapping[str, float]], Dict[str, str]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def collect(self, prefix: str, stats: Callable[[], Mapping[str, float]], **labels: str) -> None:
+        """Export the numeric values of `stats()` as `<prefix>_<key>` gauges on every scrape."""
+        with self._lock:
+            self._collectors.append((prefix, stats, labels))
+
+    def _collected(self) -> Dict[str, List[str]]:
+        series: Dict[str, List[str]] = {}
+        for prefix, stats, labels in list(self._collectors):
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning(f"Metrics collector {prefix} failed: {e}")
+                continue
+            suffix = _format_labels(list(labels), list(labels.values()))
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"{prefix}_{key}"
+                    series.setdefault(name, []).append(f"{name}{suffix} {_format_value(value)}")
+        return series
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for name, samples in self._collected().items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Chat turns (src/llm/core.py) ---
+ACTIVE_STREAMS = registry.gauge("agent_active_streams", "Chat turns currently streaming.")
+TURNS = registry.counter("agent_turns_total", "Chat turns finished, by outcome.", ["outcome"])
+TURN_SECONDS = registry.histogram("agent_turn_seconds", "Wall time of a chat turn.")
+TTFT_SECONDS = registry.histogram(
+    "agent_time_to_first_token_seconds", "Time from turn start to the first streamed text."
+)
+CANCELLED_WORK = registry.counter(
+    "agent_cancelled_work_total",
+    "Work stopped before it finished (client disconnects, timeouts), by kind: turn, llm, tool, upstream.",
+    ["kind"],
+)
+
+# --- Admission control (src/configs/admission.py) ---
+ADMISSION_WAIT_SECONDS = registry.histogram(
+    "agent_admission_wait_seconds", "Time an admitted turn waited for its session and a free slot."
+)
+ADMISSION_REJECTED = registry.counter(
+    "agent_admission_rejected_total", "Turns shed with 503, by reason (queue_full, timeout).", ["reason"]
+)
+
+# --- Conversation context (src/context/session.py) ---
+CONTEXT_TOKENS = registry.histogram(
+    "agent_context_tokens",
+    "Estimated tokens of history and summary sent with a turn.",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+CONTEXT_FOLDED = registry.counter(
+    "agent_context_folded_messages_total", "Messages folded out of the context window into the summary."
+)
+
+# --- Model calls (src/llm/telemetry.py) ---
+LLM_STEP_SECONDS = registry.histogram(
+    "agent_llm_step_seconds", "Latency of one model call, by whether it ended in tool calls.", ["step"]
+)
+LLM_TOKENS = registry.counter("agent_llm_tokens_total", "Tokens reported by the model, by direction.", ["kind"])
+
+# --- Tools (src/tools/executor.py and the agent tool wrappers) ---
+TOOL_SECONDS = registry.histogram("agent_tool_seconds", "Tool call latency, by tool.", ["tool"])
+TOOL_CALLS = registry.counter("agent_tool_calls_total", "Tool calls, by tool and status.", ["tool", "status"])
+TOOL_ERRORS = registry.counter(
+    "agent_tool_errors_total", "Tool failures, by tool and reason (exception, timeout, error).", ["tool", "reason"]
+)
+
+# --- Upstream HTTP (src/configs/http.py) ---
+UPSTREAM_SECONDS = registry.histogram(
+    "agent_upstream_seconds", "Upstream request latency per attempt, by endpoint.", ["method", "endpoint", "status"]
+)
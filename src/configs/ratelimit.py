@@ -0,0 +1,190 @@
+import asyncio
+import email.utils
+import itertools
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """Scheduling class of an upstream call; lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Priority used by AsyncHTTPRequest when a call does not pass one explicitly.
+# Background tasks (cache refreshes, prewarming) set it to BACKGROUND for their own context.
+request_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def consume(self) -> None:
+        self.tokens -= 1.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available."""
+        self._refill(now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    buckets: List[TokenBucket] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class RequestScheduler:
+    """
+    Admits upstream calls through per-host and per-endpoint token buckets.
+
+    Waiters are served in priority order. A waiter blocked on a bucket reserves
+    it for that dispatch pass, so lower-priority work cannot take the next token
+    from an interactive request, while waiters on unrelated buckets still proceed.
+    """
+
+    def __init__(self, host_rates: Dict[str, float], endpoint_rates: Dict[str, float]):
+        self.host_rates = host_rates
+        self.endpoint_rates = endpoint_rates
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _bucket(self, key: str, rate: Optional[float]) -> Optional[TokenBucket]:
+        if not rate:
+            return None
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(rate)
+        return self._buckets[key]
+
+    def _buckets_for(self, host: str, path: str) -> List[TokenBucket]:
+        buckets = [
+            self._bucket(host, self.host_rates.get(host)),
+            self._bucket(host + path, self.endpoint_rates.get(path)),
+        ]
+        return [b for b in buckets if b is not None]
+
+    async def acquire(self, host: str, path: str, priority: Priority) -> None:
+        buckets = self._buckets_for(host, path)
+        if not buckets:
+            return
+
+        now = time.monotonic()
+        if not self._waiters and all(b.available(now) for b in buckets):
+            for b in buckets:
+                b.consume()
+            return
+
+        waiter = _Waiter(int(priority), next(self._seq), buckets, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _dispatch(self) -> None:
+        # One wake-up chain at a time: a dispatch triggered by a new waiter replaces the pending one.
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        reserved: set = set()
+        next_wake: Optional[float] = None
+        remaining: List[_Waiter] = []
+
+        for waiter in sorted(self._waiters):
+            if waiter.future.done():
+                continue
+            ids = {id(b) for b in waiter.buckets}
+            if not (ids & reserved) and all(b.available(now) for b in waiter.buckets):
+                for b in waiter.buckets:
+                    b.consume()
+                waiter.future.set_result(None)
+                continue
+
+            reserved |= ids
+            remaining.append(waiter)
+            wait = max(b.wait_time(now) for b in waiter.buckets)
+            next_wake = wait if next_wake is None else min(next_wake, wait)
+
+        self._waiters = remaining
+        if next_wake is not None:
+            self._timer = asyncio.get_running_loop().call_later(max(next_wake, 0.001), self._dispatch)
+
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent traffic.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    retries can never exceed roughly `ratio` of the requests being sent.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self.tokens = min_tokens
+
+    def record_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff that never undercuts the server's `Retry-After`.
+
+    `Retry-After` is honoured up to `cap`; callers should give up rather than
+    retry when the server asks for longer.
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
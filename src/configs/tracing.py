@@ -0,0 +1,55 @@
+import importlib.util
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from src.configs.env import TRACING_ENABLED
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+_tracer: Optional[Any] = None
+_resolved = False
+
+
+def get_tracer() -> Optional[Any]:
+    """
+    The OpenTelemetry tracer, or None when tracing is off.
+
+    Only the OpenTelemetry API is used here; spans go wherever the process's
+    configured SDK exports them (and nowhere without one).
+    """
+    global _tracer, _resolved
+    if not _resolved:
+        _resolved = True
+        if TRACING_ENABLED:
+            if importlib.util.find_spec("opentelemetry") is None:
+                logger.warning("Tracing requested but 'opentelemetry-api' is not installed; spans are disabled")
+            else:
+                from opentelemetry import trace
+                _tracer = trace.get_tracer("agent")
+    return _tracer
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """Run the block in a child span of the current one; a no-op when tracing is off."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes={k: v for k, v in attributes.items() if v is not None}) as s:
+        yield s
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Any]:
+    """Start a span the caller ends itself (for callbacks that open and close it separately)."""
+    tracer = get_tracer()
+    if tracer is None:
+        return None
+    return tracer.start_span(name, attributes={k: v for k, v in attributes.items() if v is not None})
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.configs.env import (
+    SESSION_BACKEND,
+    SESSION_DB_PATH,
+    SESSION_MAX_SESSIONS,
+    SESSION_HISTORY_LIMIT,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MESSAGE_MAX_TOKENS,
+    CONTEXT_COLD_LOAD_MESSAGES,
+)
+from src.configs.metrics import CONTEXT_FOLDED, CONTEXT_TOKENS, registry
+from src.context.window import ContextWindow
+
+_ROLES = {"user": HumanMessage, "ai": AIMessage}
+
+
+def _role(message: BaseMessage) -> str:
+    return "user" if isinstance(message, HumanMessage) else "ai"
+
+
+def session_id_from(config: Mapping[str, Any]) -> str:
+    """The session a tool call belongs to, from the `thread_id` that stream_response configures."""
+    return (config or {}).get("configurable", {}).get("thread_id", "default")
+
+
+class MemoryBackend:
+    """Keeps nothing beyond the in-memory LRU; sessions are lost on restart or eviction."""
+
+    # Only this process writes the session, so its resident window is always current.
+    shared = False
+
+    async def load(self, session_id: str, limit: int, after: int = 0) -> Tuple[List[BaseMessage], int]:
+        return [], after
+
+    async def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        return None
+
+
+class SQLiteBackend:
+    """
+    Durable conversation log in a SQLite file shared by every worker on the host.
+
+    Rows are numbered by `seq`, so a worker holding a window can read just
+    the messages other workers appended after the last row it has seen.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_messages ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS session_messages_session ON session_messages (session_id, seq)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _load(self, session_id: str, limit: int, after: int) -> Tuple[List[BaseMessage], int]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, role, content FROM session_messages WHERE session_id = ? AND seq > ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (session_id, after, limit),
+            ).fetchall()
+        messages = [_ROLES[role](content=content) for _, role, content in reversed(rows)]
+        return messages, rows[0][0] if rows else after
+
+    def _append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        with self._lock:
+            self._connection().executemany(
+                "INSERT INTO session_messages (session_id, role, content) VALUES (?, ?, ?)",
+                [(session_id, _role(m), m.content) for m in messages],
+            )
+
+    async def load(self, session_id: str, limit: int, after: int = 0) -> Tuple[List[BaseMessage], int]:
+        """The last `limit` messages after row `after`, oldest first, and the newest row read."""
+        return await asyncio.to_thread(self._load, session_id, limit, after)
+
+    async def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        await asyncio.to_thread(self._append, session_id, messages)
+
+
+class SessionStore:
+    """
+    Server-side conversation history keyed by `session_id`.
+
+    Recent sessions live in an in-memory LRU as ready-to-use context windows;
+    the backend is read in full when a session is not resident and is appended
+    to as turns complete. Each window holds the recent messages that fit the
+    token budget plus a summary of the travel facts in older ones.
+
+    With a backend shared by several workers, a resident window also reads the
+    rows appended after the last one it has seen before each use, so turns of
+    one session landing on different workers build on the same history.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_sessions: int = 1024,
+        history_limit: int = 40,
+        token_budget: int = 4000,
+        message_max_tokens: int = 1500,
+        cold_load_limit: int = 200,
+    ):
+        self.backend = backend or MemoryBackend()
+        self.max_sessions = max_sessions
+        self.history_limit = history_limit
+        self.token_budget = token_budget
+        self.message_max_tokens = message_max_tokens
+        self.cold_load_limit = cold_load_limit
+        self._sessions: "OrderedDict[str, ContextWindow]" = OrderedDict()
+
+    async def _window(self, session_id: str) -> ContextWindow:
+        window = self._sessions.get(session_id)
+        if window is None:
+            window = ContextWindow(self.token_budget, self.history_limit, self.message_max_tokens)
+            # A cold session replays a longer tail so facts from before the window survive restarts.
+            messages, window.seen = await self.backend.load(session_id, self.cold_load_limit)
+            window.extend(messages)
+            self._remember(session_id, window)
+        else:
+            self._sessions.move_to_end(session_id)
+            if self.backend.shared:
+                await self._catch_up(session_id, window)
+        return window
+
+    async def _catch_up(self, session_id: str, window: ContextWindow) -> int:
+        messages, window.seen = await self.backend.load(session_id, self.cold_load_limit, window.seen)
+        return window.extend(messages) if messages else 0
+
+    async def history(self, session_id: str) -> List[BaseMessage]:
+        """The messages of the session that fit the context window, oldest first."""
+        return list((await self._window(session_id)).messages)
+
+    async def context(self, session_id: str) -> List[BaseMessage]:
+        """What the model sees before the new message: the summary of older turns, then the window."""
+        messages, tokens = (await self._window(session_id)).context()
+        CONTEXT_TOKENS.observe(tokens)
+        return messages
+
+    async def append(self, session_id: str, *messages: BaseMessage) -> None:
+        window = await self._window(session_id)
+        await self.backend.append(session_id, list(messages))
+        # Read back from a shared backend so the window keeps its order if another worker wrote in between.
+        folded = await self._catch_up(session_id, window) if self.backend.shared else window.extend(messages)
+        if folded:
+            CONTEXT_FOLDED.inc(amount=folded)
+
+    def _remember(self, session_id: str, window: ContextWindow) -> None:
+        self._sessions[session_id] = window
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "resident_sessions": len(self._sessions),
+            "resident_tokens": sum(sum(w.tokens) for w in list(self._sessions.values())),
+        }
+
+
+session_store = SessionStore(
+    backend=SQLiteBackend(SESSION_DB_PATH) if SESSION_BACKEND == "sqlite" else MemoryBackend(),
+    max_sessions=SESSION_MAX_SESSIONS,
+    history_limit=SESSION_HISTORY_LIMIT,
+    token_budget=CONTEXT_TOKEN_BUDGET,
+    message_max_tokens=CONTEXT_MESSAGE_MAX_TOKENS,
+    cold_load_limit=CONTEXT_COLD_LOAD_MESSAGES,
+)
+registry.collect("agent_sessions", session_store.stats)
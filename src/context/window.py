@@ -0,0 +1,192 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from src.tools.flight.airports import AirportIndex
+
+# Per-message framing (role, separators) that the model's chat template adds.
+MESSAGE_OVERHEAD_TOKENS = 4
+# How many of each kind of fact the summary keeps; the most recent mentions win.
+MAX_NAMES = 4
+MAX_PLACES = 8
+MAX_DATES = 6
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+_DATE = re.compile(
+    r"\b(?:\d{4}-\d{2}-\d{2}"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?(?:\s+of)?\s+{_MONTHS}\b(?:\s+\d{{4}})?"
+    rf"|{_MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?\b(?:,?\s+\d{{4}})?)",
+    re.IGNORECASE,
+)
+_NUMBERS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+_PARTY = re.compile(
+    r"\b(\d{1,2}|one|two|three|four|five|six|seven|eight|nine)\s+"
+    r"(adults?|people|persons|passengers|travell?ers|children|child|kids?|infants?|bab(?:y|ies))\b",
+    re.IGNORECASE,
+)
+_PARTY_KINDS = {"child": "children", "kid": "children", "infant": "infants", "bab": "infants"}
+_SINGULAR = {"adults": "adult", "children": "child", "infants": "infant"}
+_NAME = re.compile(r"(?i:\bmy name is|\bi am|\bi'm|\bthis is)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})")
+_CABIN = re.compile(r"\b(premium economy|economy|business|first class)\b", re.IGNORECASE)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local estimate of the tokens `text` costs, without calling the model.
+
+    Subword tokenizers spend about one token per four characters of prose
+    and one per word or symbol in JSON and codes, so the larger of the two
+    counts is taken. It errs high, which is the safe side for a budget.
+    """
+    return max(len(_PIECES.findall(text)), math.ceil(len(text) / 4))
+
+
+def message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def clip(message: BaseMessage, max_tokens: int) -> Tuple[BaseMessage, int]:
+    """`message` and its token cost, with the text cut to `max_tokens` when longer (pasted dumps)."""
+    text = message_text(message)
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return message, tokens + MESSAGE_OVERHEAD_TOKENS
+    # Keep the head by characters; the marker tells the model something was dropped.
+    head = text[:max(len(text) * max_tokens // tokens - 16, 0)]
+    clipped = f"{head} …[truncated {tokens - count_tokens(head)} tokens]"
+    return type(message)(content=clipped), count_tokens(clipped) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _keep(facts: Dict[str, str], key: str, value: str, limit: int) -> None:
+    # Insertion-ordered dict as a recency list: re-mentioned keys move to the end.
+    facts.pop(key, None)
+    facts[key] = value
+    while len(facts) > limit:
+        facts.pop(next(iter(facts)))
+
+
+@dataclass
+class TravelFacts:
+    """
+    Booking-relevant facts from turns that no longer fit the context window.
+
+    Facts are pulled from text with regular expressions and the airport index:
+    traveller names, places (with their IATA codes), dates, party size and
+    cabin. Messages are absorbed once, as they leave the window, so the
+    summary is only recomputed when it changes.
+    """
+    names: Dict[str, str] = field(default_factory=dict)
+    places: Dict[str, str] = field(default_factory=dict)
+    dates: Dict[str, str] = field(default_factory=dict)
+    party: Dict[str, int] = field(default_factory=dict)
+    cabin: Optional[str] = None
+    folded: int = 0
+    _summary: Optional[str] = field(default=None, repr=False)
+
+    def absorb(self, messages: Iterable[BaseMessage]) -> None:
+        for message in messages:
+            text = message_text(message)
+            if isinstance(message, HumanMessage):
+                for name in _NAME.findall(text):
+                    _keep(self.names, name.lower(), name, MAX_NAMES)
+            for mention, code in AirportIndex.find_places(text):
+                _keep(self.places, code, mention if mention != code else self.places.get(code, code), MAX_PLACES)
+            for match in _DATE.finditer(text):
+                date = " ".join(match.group(0).split())
+                _keep(self.dates, date.lower(), date, MAX_DATES)
+            for count, kind in _PARTY.findall(text):
+                kind = kind.lower()
+                kind = next((v for k, v in _PARTY_KINDS.items() if kind.startswith(k)), "adults")
+                self.party[kind] = int(count) if count.isdigit() else _NUMBERS[count.lower()]
+            for cabin in _CABIN.findall(text):
+                self.cabin = cabin.lower()
+            self.folded += 1
+        self._summary = None
+
+    def render(self) -> Optional[str]:
+        """One-paragraph summary for the model, or None when nothing has been folded yet."""
+        if not self.folded:
+            return None
+        if self._summary is None:
+            facts = []
+            if self.names:
+                facts.append("travellers " + ", ".join(self.names.values()))
+            if self.places:
+                facts.append("places " + ", ".join(
+                    m if m == code else f"{m} ({code})" for code, m in self.places.items()
+                ))
+            if self.dates:
+                facts.append("dates " + ", ".join(self.dates.values()))
+            if self.party:
+                facts.append("party " + ", ".join(
+                    f"{n} {_SINGULAR[kind] if n == 1 else kind}" for kind, n in self.party.items()
+                ))
+            if self.cabin:
+                facts.append(f"cabin {self.cabin}")
+            summary = f"{self.folded} earlier messages of this conversation are not shown."
+            if facts:
+                summary += " Facts mentioned in them, most recent last: " + "; ".join(facts) + "."
+            self._summary = summary
+        return self._summary
+
+
+class ContextWindow:
+    """
+    The part of a conversation sent to the model on each turn.
+
+    Recent messages are kept while they fit `token_budget` and
+    `max_messages`; older ones are folded into `TravelFacts`, whose summary
+    is sent ahead of them, so the prompt stays flat as a conversation grows.
+    The window always starts on a user message.
+    """
+
+    def __init__(self, token_budget: int, max_messages: int, message_max_tokens: int):
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        self.message_max_tokens = message_max_tokens
+        self.messages: List[BaseMessage] = []
+        self.tokens: List[int] = []
+        self.facts = TravelFacts()
+        # Newest backend row already in the window, for backends shared between workers.
+        self.seen = 0
+
+    def extend(self, messages: Iterable[BaseMessage]) -> int:
+        """Add messages in order; returns how many older messages were folded out."""
+        for message in messages:
+            message, tokens = clip(message, self.message_max_tokens)
+            self.messages.append(message)
+            self.tokens.append(tokens)
+        return self._fit()
+
+    def _fit(self) -> int:
+        drop, total = 0, sum(self.tokens)
+        while drop < len(self.messages) - 1 and (
+            len(self.messages) - drop > self.max_messages or total > self.token_budget
+        ):
+            total -= self.tokens[drop]
+            drop += 1
+        while drop < len(self.messages) and isinstance(self.messages[drop], AIMessage):
+            drop += 1
+        if drop:
+            self.facts.absorb(self.messages[:drop])
+            del self.messages[:drop]
+            del self.tokens[:drop]
+        return drop
+
+    def context(self) -> Tuple[List[BaseMessage], int]:
+        """Messages to send ahead of the new user message, and their estimated token cost."""
+        summary = self.facts.render()
+        if summary is None:
+            return list(self.messages), sum(self.tokens)
+        cost = count_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+        return [SystemMessage(content=summary)] + self.messages, sum(self.tokens) + cost
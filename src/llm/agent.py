@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Optional
+from src.configs.env import GEMINI_API_KEY, GEMINI_MODEL
+from src.llm.prompt import SYSTEM_PROMPT
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Built on first use (or by warmup) so importing the app stays cheap.
+_agent: Optional[Any] = None
+_agent_lock = threading.Lock()
+
+
+def build_agent(model: Optional[Any] = None):
+    """
+    Construct the tool-calling agent.
+
+    LangChain, the Gemini client and the tool registry are imported here
+    rather than at module level; they dominate import time.
+    """
+    from langchain.agents import create_agent
+    from src.tools.executor import tool_execution
+    from src.tools.registry import tools
+
+    if model is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        model = ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            google_api_key=GEMINI_API_KEY,
+            streaming=True
+        )
+
+    return create_agent(
+        model,
+        tools=tools,
+        system_prompt=SYSTEM_PROMPT,
+        middleware=[tool_execution]
+    )
+
+
+def get_agent():
+    """Return the shared agent, building it once on first call."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                started = time.perf_counter()
+                _agent = build_agent()
+                logger.info(f"Agent built in {time.perf_counter() - started:.2f}s")
+    return _agent
+
+
+def use_model(model: Any) -> None:
+    """Rebuild the shared agent around `model` instead of Gemini (benchmarks, replays)."""
+    global _agent
+    with _agent_lock:
+        _agent = build_agent(model)
+
+
+async def aget_agent():
+    """Like get_agent, but builds off the event loop so streams in progress keep flowing."""
+    if _agent is not None:
+        return _agent
+    return await asyncio.to_thread(get_agent)
+
+
+async def warmup() -> None:
+    """Build the agent ahead of the first chat request."""
+    try:
+        await aget_agent()
+    except Exception as e:
+        logger.error(f"Agent warmup failed: {e}")
@@ -1,12 +1,16 @@
 import asyncio
 import logging
-import json
-from src.configs.env import GEMINI_API_KEY
-from src.llm.prompt import SYSTEM_PROMPT
-from src.tools.registry import tools
-from langchain.agents import create_agent
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+import time
+from contextlib import aclosing
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from src.cassette.recorder import recording
+from src.configs.env import CASSETTE_MODE
+from src.configs.metrics import ACTIVE_STREAMS, CANCELLED_WORK, TTFT_SECONDS, TURNS, TURN_SECONDS
+from src.configs.tracing import span
+from src.llm.agent import aget_agent
+from src.llm.sse import sse_event
+from src.llm.telemetry import llm_telemetry
+from src.context.session import session_store
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -17,20 +21,6 @@ if not logger.handlers:
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
-# --- Initialize LLM ---
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=GEMINI_API_KEY,
-    streaming=True
-)
-
-# Create agent WITHOUT tools first (for general chat)
-agent = create_agent(
-    model, 
-    tools=tools,
-    system_prompt=SYSTEM_PROMPT
-)
-
 def extract_text_content(msg: BaseMessage) -> str:
     """Extract text from Gemini's content list structure."""
     if not hasattr(msg, 'content') or msg.content is None:
@@ -58,6 +48,20 @@ def extract_text_content(msg: BaseMessage) -> str:
     return str(content).strip()
 
 
+def delta_text(chunk: AIMessageChunk) -> str:
+    """Text carried by one streamed chunk, with whitespace preserved."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get('type', 'text') == 'text':
+            parts.append(str(block.get('text', '')))
+    return ''.join(parts)
+
+
 def get_session_config(session_id: str) -> dict:
     """Get configuration for agent stream with session context."""
     return {
@@ -67,41 +71,97 @@ def get_session_config(session_id: str) -> dict:
     }
 
 
-async def stream_response(user_input: str, session_id: str, client_history: str = None):
-    """Resume from client-stored history + save new messages."""
+async def stream_response(user_input: str, session_id: str):
+    """
+    Stream one agent turn as typed SSE events.
+
+    Conversation history is read from and appended to the server-side
+    session store, so callers only send the new message. The store sends
+    the recent turns that fit its token budget, after a summary of the
+    travel facts in older ones.
+
+    - `delta`: a text fragment from the model, as soon as it is generated
+    - `tool_start` / `tool_end`: a tool call was issued / returned; `tool_end`
+      carries `job_id` when the tool queued a background booking
+    - `done`: the turn finished
+    - `error`: the turn failed
+
+    Closing or cancelling the stream (the client disconnected) cancels the
+    model call and tool calls in flight; bookings already handed to the job
+    queue still complete. Nothing is stored for a cancelled turn.
+    """
+    started = time.perf_counter()
+    first_token = False
+    outcome = "error"
+    ACTIVE_STREAMS.inc()
     try:
-        config = get_session_config(session_id)
-        
-        # Parse client history (fallback to empty)
-        initial_messages = []
-        if client_history:
-            try:
-                history = json.loads(client_history)
-                for msg in history[-10:]:  # Last 10 messages max
-                    if msg['sender'] == 'user':
-                        initial_messages.append(HumanMessage(content=msg['content']))
-                    elif msg['sender'] == 'ai':
-                        initial_messages.append(AIMessage(content=msg['content']))
-            except:
-                pass
-        
-        # Add new user input
-        initial_messages.append(HumanMessage(content=user_input))
-        
-        input_state = {"messages": initial_messages}
-        full_response = []
-
-        # Stream with full context
-        async for chunk in agent.astream(input_state, config=config, stream_mode="values"):
-            if "messages" in chunk:
-                latest_msg = chunk["messages"][-1]
-                if isinstance(latest_msg, AIMessage):
-                    content = extract_text_content(latest_msg)
-                    if content and content not in full_response[-1:] if full_response else True:
-                        full_response.append(content)
-                        yield f"data: {content}\n\n"
-
-        yield "data: [DONE]\n\n"
-        
+        with span("chat turn", **{"session.id": session_id}):
+            agent = await aget_agent()
+            config = get_session_config(session_id)
+            config["callbacks"] = [llm_telemetry]
+
+            user_message = HumanMessage(content=user_input)
+            history = await session_store.context(session_id)
+            input_state = {"messages": history + [user_message]}
+            reply = []
+            tools_run = []
+
+            async with recording(session_id, user_input, CASSETTE_MODE == "record") as cassette:
+                if cassette is not None:
+                    config["callbacks"].append(cassette.callback)
+
+                # Closed explicitly so a cancelled turn also cancels the model and tool tasks the graph is running.
+                events = agent.astream(input_state, config=config, stream_mode="messages")
+                async with aclosing(events):
+                    # "messages" mode yields LLM chunks token by token, plus each ToolMessage as tools finish.
+                    async for message, metadata in events:
+                        if isinstance(message, AIMessageChunk):
+                            for call in message.tool_call_chunks:
+                                if call.get("name"):
+                                    yield sse_event("tool_start", {"id": call.get("id"), "name": call["name"]})
+                            text = delta_text(message)
+                            if text:
+                                if not first_token:
+                                    first_token = True
+                                    TTFT_SECONDS.observe(time.perf_counter() - started)
+                                if cassette is not None:
+                                    cassette.mark_first_token()
+                                reply.append(text)
+                                yield sse_event("delta", {"text": text})
+                        elif isinstance(message, ToolMessage):
+                            if cassette is not None:
+                                cassette.tool_calls += 1
+                            event = {
+                                "id": message.tool_call_id,
+                                "name": message.name,
+                                "status": message.status,
+                            }
+                            # Booking tools hand back a background job; clients follow it on /jobs/{id}/events.
+                            if isinstance(message.artifact, dict) and message.artifact.get("job_id"):
+                                event["job_id"] = message.artifact["job_id"]
+                                tools_run.append(f"{message.name} (job {event['job_id']})")
+                            else:
+                                tools_run.append(message.name)
+                            yield sse_event("tool_end", event)
+
+            # A tool-only turn is stored as a note of what ran, so later turns know e.g. which booking job exists.
+            reply_text = "".join(reply) or (f"(Called {', '.join(tools_run)}; no reply text.)" if tools_run else "")
+            if reply_text:
+                await session_store.append(session_id, user_message, AIMessage(content=reply_text))
+            else:
+                await session_store.append(session_id, user_message)
+            outcome = "done"
+            yield sse_event("done", {})
+
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        CANCELLED_WORK.inc("turn")
+        logger.info(f"Turn for session {session_id} cancelled after {time.perf_counter() - started:.2f}s")
+        raise
     except Exception as e:
-        yield f"data: ⚠️ Error: {str(e)}\n\n"
\ No newline at end of file
+        logger.error(f"Agent streaming error: {e}")
+        yield sse_event("error", {"message": str(e)})
+    finally:
+        ACTIVE_STREAMS.dec()
+        TURNS.inc(outcome)
+        TURN_SECONDS.observe(time.perf_counter() - started)
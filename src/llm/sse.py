@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import re
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import orjson
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Frame one typed Server-Sent Event with a JSON payload.
+
+    Every line of the payload gets its own `data:` field, so a line break can
+    never terminate the event early; clients rejoin the lines with "\\n".
+    """
+    payload = orjson.dumps(data).decode()
+    lines = "\n".join(f"data: {line}" for line in _LINE_BREAK.split(payload))
+    return f"event: {event}\n{lines}\n\n"
+
+
+async def until_disconnected(
+    events: AsyncIterator[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float,
+) -> AsyncIterator[str]:
+    """
+    Relay `events` to a streaming response and cancel them when the client goes away.
+
+    The events are produced in their own task, so a disconnect noticed while
+    the agent is waiting on the model or a tool cancels that wait at once
+    instead of at the next event the server fails to write. The queue holds
+    one event, so a slow client still paces the producer.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    async def produce() -> None:
+        # A cancel can land here rather than inside `events`; closing them still unwinds the turn.
+        async with aclosing(events):
+            async for event in events:
+                await queue.put(event)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            try:
+                while not getter.done():
+                    await asyncio.wait((getter, producer), timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        break
+                    if producer.done() and queue.empty():
+                        producer.result()  # re-raise what ended the stream, if anything
+                        return
+                    if await is_disconnected():
+                        logger.info("Client disconnected, cancelling the turn")
+                        return
+            finally:
+                getter.cancel()
+            yield getter.result()
+    finally:
+        if not producer.done():
+            producer.cancel()
+            # `wait`, not `gather`: a server re-cancelling this task must not interrupt the producer's cleanup.
+            await asyncio.wait((producer,))
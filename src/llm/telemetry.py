@@ -0,0 +1,57 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+from src.configs.metrics import CANCELLED_WORK, LLM_STEP_SECONDS, LLM_TOKENS
+from src.configs.tracing import start_span
+
+
+class LLMTelemetry(AsyncCallbackHandler):
+    """
+    Times every chat-model call of a turn and counts its tokens.
+
+    A step is labelled `tool_call` when the model asked for tools and `reply`
+    when it answered, so slow planning and slow answering can be told apart.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, Tuple[float, Optional[Any]]] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        batch = messages[0] if messages else []
+        self._runs[run_id] = (time.perf_counter(), start_span("llm step", **{"llm.messages": len(batch)}))
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        started, span = self._runs.pop(run_id, (None, None))
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        step = "tool_call" if getattr(message, "tool_calls", None) else "reply"
+        if started is not None:
+            LLM_STEP_SECONDS.observe(time.perf_counter() - started, step)
+
+        usage = getattr(message, "usage_metadata", None) or {}
+        for kind in ("input_tokens", "output_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.inc(kind.removesuffix("_tokens"), amount=usage[kind])
+
+        if span is not None:
+            span.set_attribute("llm.step", step)
+            for kind, count in usage.items():
+                if isinstance(count, int):
+                    span.set_attribute(f"llm.usage.{kind}", count)
+            span.end()
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        started, span = self._runs.pop(run_id, (None, None))
+        cancelled = isinstance(error, asyncio.CancelledError)
+        if cancelled:
+            CANCELLED_WORK.inc("llm")
+        if started is not None:
+            LLM_STEP_SECONDS.observe(time.perf_counter() - started, "cancelled" if cancelled else "error")
+        if span is not None:
+            span.record_exception(error)
+            span.end()
+
+
+llm_telemetry = LLMTelemetry()
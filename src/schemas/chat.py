@@ -0,0 +1,14 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+def new_session_id() -> str:
+    """A fresh id for a client that did not send one, so anonymous clients never share a session."""
+    return f"anon_{uuid.uuid4().hex}"
+
+
+class ChatRequest(BaseModel):
+    """Body of `POST /chat/stream`: only the new message, history lives server-side."""
+    prompt: str = Field(..., min_length=1)
+    session_id: str = Field(default_factory=new_session_id, max_length=128)
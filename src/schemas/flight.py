@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from src.schemas.agent import AgentGuidedModel
 
 
@@ -92,19 +92,18 @@ class PricingOptions(BaseModel):
 # -------------------------
 
 class FareDetailsBySegment(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     segmentId: str
     cabin: str
     fareBasis: str
     brandedFare: str
     brandedFareLabel: str
-    class_: str
+    class_: str = Field(alias="class")
     includedCheckedBags: BagAllowance
     includedCabinBags: BagAllowance
     amenities: List[Amenity]
 
-    class Config:
-        fields = {"class_": "class"}
-
 
 class TravelerPricing(BaseModel):
     travelerId: str
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for `tp`, built once per type; building one compiles the whole schema tree."""
+    return TypeAdapter(tp)
+
+
+def validate(tp: Any, data: Any) -> Any:
+    """Validate untrusted Python data (agent tool input, API bodies) against `tp`."""
+    return adapter(tp).validate_python(data)
+
+
+def validate_json(tp: Any, raw: Union[bytes, str]) -> Any:
+    """Validate a JSON document against `tp` without decoding it to dicts first."""
+    return adapter(tp).validate_json(raw)
+
+
+def _model_in(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The model nested in a field annotation (Model, Optional[Model], List[Model]) and whether it is a list."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    origin = get_origin(annotation)
+    for arg in get_args(annotation):
+        model, _ = _model_in(arg)
+        if model is not None:
+            return model, origin in (list, List)
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _nested_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Type[BaseModel], bool], ...]:
+    fields = []
+    for name, info in model.model_fields.items():
+        nested, many = _model_in(info.annotation)
+        if nested is not None:
+            fields.append((info.alias or name, nested, many))
+    return tuple(fields)
+
+
+def construct(model: Type[M], data: Dict[str, Any]) -> M:
+    """
+    Build `model` from data we produced or already validated, skipping validation.
+
+    Nested models are constructed too, so the result dumps like a validated
+    instance. It pays off for schemas with costly validators (EmailStr,
+    dates) such as hotel orders; for large plain trees like flight offers
+    pydantic-core validation is as fast (see benchmarks/serialization.py).
+
+    Leaf values are kept as given (dates stay ISO strings) and fields the
+    schema does not declare are dropped, so never use this on payloads that
+    must be sent back upstream verbatim (flight offers).
+    """
+    values = dict(data)
+    for key, nested, many in _nested_fields(model):
+        raw = values.get(key)
+        if raw is None:
+            continue
+        if many:
+            values[key] = [construct(nested, v) if isinstance(v, dict) else v for v in raw]
+        elif isinstance(raw, dict):
+            values[key] = construct(nested, raw)
+    return model.model_construct(**values)
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    Encode a model or plain JSON data to bytes, ready for an httpx `content=` body.
+
+    Models go through their cached serializer using field aliases; warnings
+    are off because constructed models legitimately hold raw JSON values.
+    Plain dicts and lists (upstream offers) are encoded with orjson.
+    """
+    if isinstance(value, BaseModel):
+        return adapter(type(value)).dump_json(value, by_alias=True, warnings=False)
+    return orjson.dumps(value)
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langgraph.config import get_config
+
+from src.configs.env import (
+    TOOL_CONCURRENCY_GLOBAL,
+    TOOL_CONCURRENCY_PER_SESSION,
+    TOOL_CALL_TIMEOUT,
+)
+from src.configs.metrics import CANCELLED_WORK, TOOL_CALLS, TOOL_ERRORS, TOOL_SECONDS, registry
+from src.configs.tracing import span
+from src.context.session import session_id_from
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+class BoundedToolExecution(AgentMiddleware):
+    """
+    Bounds the tool calls the agent runs concurrently for one model turn.
+
+    The agent already dispatches every tool call of a turn at once and returns
+    the results in call order; this middleware caps how many run at the same
+    time globally and per session, and gives each call its own timeout.
+    """
+
+    def __init__(
+        self,
+        global_limit: int = TOOL_CONCURRENCY_GLOBAL,
+        session_limit: int = TOOL_CONCURRENCY_PER_SESSION,
+        timeout: float = TOOL_CALL_TIMEOUT,
+    ):
+        super().__init__()
+        self.global_limit = global_limit
+        self.session_limit = session_limit
+        self.timeout = timeout
+        self._global = asyncio.Semaphore(global_limit)
+        self._sessions: Dict[str, asyncio.Semaphore] = {}
+        self._holders: Dict[str, int] = {}
+        self._running = 0
+
+    def _session_slot(self, session_id: str) -> asyncio.Semaphore:
+        if session_id not in self._sessions:
+            self._sessions[session_id] = asyncio.Semaphore(self.session_limit)
+            self._holders[session_id] = 0
+        return self._sessions[session_id]
+
+    async def awrap_tool_call(
+        self,
+        request,
+        handler: Callable[..., Awaitable[ToolMessage]],
+    ):
+        call = request.tool_call
+        session_id = session_id_from(get_config())
+        timeout = self.timeout
+
+        slot = self._session_slot(session_id)
+        self._holders[session_id] += 1
+        status = "error"
+        started = time.perf_counter()
+        try:
+            with span(f"tool {call['name']}", **{"tool.name": call["name"], "session.id": session_id}):
+                async with slot, self._global:
+                    self._running += 1
+                    # Latency counts from here so queueing for a slot is not charged to the tool.
+                    started = time.perf_counter()
+                    try:
+                        result = await asyncio.wait_for(handler(request), timeout)
+                    finally:
+                        self._running -= 1
+            status = getattr(result, "status", "success")
+            if status == "error":
+                TOOL_ERRORS.inc(call["name"], "error")
+            return result
+        except asyncio.TimeoutError:
+            status = "timeout"
+            TOOL_ERRORS.inc(call["name"], "timeout")
+            logger.warning(f"Tool {call['name']} timed out after {timeout}s")
+            return ToolMessage(
+                content=f"Tool '{call['name']}' timed out after {timeout:.0f}s. Try again or narrow the request.",
+                tool_call_id=call["id"],
+                name=call["name"],
+                status="error",
+            )
+        except asyncio.CancelledError:
+            status = "cancelled"
+            CANCELLED_WORK.inc("tool")
+            raise
+        except Exception:
+            TOOL_ERRORS.inc(call["name"], "exception")
+            raise
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - started, call["name"])
+            TOOL_CALLS.inc(call["name"], status)
+            self._holders[session_id] -= 1
+            if not self._holders[session_id]:
+                del self._holders[session_id]
+                del self._sessions[session_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._running,
+            "active_sessions": len(self._sessions),
+        }
+
+
+tool_execution = BoundedToolExecution()
+registry.collect("agent_tool_execution", tool_execution.stats)
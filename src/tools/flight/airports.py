@@ -0,0 +1,280 @@
+import bisect
+import heapq
+import mmap
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DATA_PATH = Path(__file__).parent / "data" / "airports.tsv"
+
+# Names shortlisted by trigram overlap, and the similarity ratio a fuzzy match must reach.
+FUZZY_CANDIDATES = 10
+FUZZY_THRESHOLD = 0.85
+# Shortest query that may be completed by prefix search ("lond" -> London).
+MIN_PREFIX_LENGTH = 4
+
+
+class UnknownLocationError(ValueError):
+    """Raised when a location cannot be resolved to an IATA code."""
+
+    def __init__(self, location: str):
+        super().__init__(f"Could not resolve '{location}' to an airport or city code")
+        self.location = location
+
+
+@dataclass(frozen=True)
+class Airport:
+    code: str
+    city_code: str
+    name: str
+    city: str
+    regions: Tuple[str, ...]
+    country: str
+    rank: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    """One searchable name pointing at an airport or a city code."""
+    code: str
+    airport: Airport
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip diacritics and collapse punctuation so "São Paulo" matches "sao paulo"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_only = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", ascii_only.lower()).split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AirportIndex:
+    """
+    Offline lookup from free-text city or airport names to IATA codes.
+
+    The bundled table is memory-mapped and parsed on first use. City names
+    resolve to the metropolitan city code (London -> LON) so searches cover
+    every airport of the city; airport names resolve to the airport itself.
+    A trailing qualifier ("Paris, Texas") narrows by region or country.
+    Exact names win, then prefixes, then trigram similarity; anything else
+    is reported as unresolved rather than guessed.
+    """
+    _lock = threading.Lock()
+    _loaded: bool = False
+    _airports: Dict[str, Airport] = {}
+    _cities: Dict[str, List[Airport]] = {}
+    _countries: Dict[str, str] = {}
+    _names: Dict[str, List[_Entry]] = {}
+    _sorted_names: List[str] = []
+    _trigram_index: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def _load(cls) -> None:
+        if cls._loaded:
+            return
+        with cls._lock:
+            if cls._loaded:
+                return
+
+            airports: Dict[str, Airport] = {}
+            cities: Dict[str, List[Airport]] = defaultdict(list)
+            countries: Dict[str, str] = {}
+            names: Dict[str, List[_Entry]] = defaultdict(list)
+
+            def add_name(name: str, entry: _Entry) -> None:
+                key = fold(name)
+                if key and all(e.code != entry.code for e in names[key]):
+                    names[key].append(entry)
+
+            with open(DATA_PATH, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for raw in iter(data.readline, b""):
+                    line = raw.decode("utf-8").rstrip("\r\n")
+                    if not line or line.startswith("#"):
+                        continue
+                    fields = line.split("\t")
+                    if line.startswith("@"):
+                        for alias in fields[1].split("|"):
+                            countries[fold(alias)] = fields[0][1:]
+                        countries[fold(fields[0][1:])] = fields[0][1:]
+                        continue
+
+                    code, city_code, name, city, regions, country, aliases = fields
+                    airport = Airport(
+                        code=code,
+                        city_code=city_code,
+                        name=name,
+                        city=city,
+                        regions=tuple(fold(r) for r in regions.split("|") if r),
+                        country=country,
+                        rank=len(airports),
+                    )
+                    airports[code] = airport
+                    cities[city_code].append(airport)
+
+                    add_name(city, _Entry(city_code, airport))
+                    for alias in filter(None, aliases.split("|")):
+                        add_name(alias, _Entry(city_code, airport))
+                    add_name(name, _Entry(code, airport))
+                    add_name(f"{city} {name}", _Entry(code, airport))
+
+            trigram_index: Dict[str, Set[str]] = defaultdict(set)
+            for key in names:
+                for gram in _trigrams(key):
+                    trigram_index[gram].add(key)
+
+            cls._airports = airports
+            cls._cities = dict(cities)
+            cls._countries = countries
+            cls._names = dict(names)
+            cls._sorted_names = sorted(names)
+            cls._trigram_index = dict(trigram_index)
+            cls._loaded = True
+
+    @classmethod
+    def _matches_qualifier(cls, airport: Airport, qualifier: str) -> bool:
+        return (
+            qualifier in airport.regions
+            or cls._countries.get(qualifier) == airport.country
+            or qualifier == fold(airport.city)
+        )
+
+    @classmethod
+    def _pick(cls, entries: Iterable[_Entry], qualifier: Optional[str]) -> Optional[str]:
+        if qualifier:
+            entries = [e for e in entries if cls._matches_qualifier(e.airport, qualifier)]
+        best = min(entries, key=lambda e: e.airport.rank, default=None)
+        return best.code if best else None
+
+    @classmethod
+    def _prefix(cls, name: str) -> List[_Entry]:
+        if len(name) < MIN_PREFIX_LENGTH:
+            return []
+        start = bisect.bisect_left(cls._sorted_names, name)
+        entries: List[_Entry] = []
+        for key in cls._sorted_names[start:]:
+            if not key.startswith(name):
+                break
+            entries.extend(cls._names[key])
+        return entries
+
+    @classmethod
+    def _fuzzy(cls, name: str) -> List[_Entry]:
+        # Trigram overlap picks a shortlist cheaply; edit similarity decides among it.
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in _trigrams(name):
+            for key in cls._trigram_index.get(gram, ()):
+                overlap[key] += 1
+        shortlist = heapq.nlargest(FUZZY_CANDIDATES, overlap, key=overlap.__getitem__)
+
+        best_score, best_key = 0.0, None
+        for key in shortlist:
+            score = SequenceMatcher(None, name, key).ratio()
+            if score > best_score:
+                best_score, best_key = score, key
+
+        if best_key is None or best_score < FUZZY_THRESHOLD:
+            return []
+        return cls._names[best_key]
+
+    @classmethod
+    def _lookup(cls, name: str, qualifier: Optional[str]) -> Optional[str]:
+        if name in cls._names:
+            return cls._pick(cls._names[name], qualifier)
+        for search in (cls._prefix, cls._fuzzy):
+            code = cls._pick(search(name), qualifier)
+            if code:
+                return code
+        return None
+
+    @classmethod
+    def resolve(cls, location: str) -> Optional[str]:
+        """Resolve a city/airport name or code to an IATA code, or None when unknown."""
+        if not location or not location.strip():
+            return None
+
+        raw = location.strip()
+        cls._load()
+        # Three letters are a code unless written as a known name ("Goa", "Rio").
+        if len(raw) == 3 and raw.isalpha() and (raw.isupper() or fold(raw) not in cls._names):
+            return raw.upper()
+
+        name, _, qualifier = raw.partition(",")
+        name, qualifier = fold(name), fold(qualifier) or None
+        if not name:
+            return None
+
+        if qualifier or name in cls._names:
+            return cls._lookup(name, qualifier)
+
+        # "Paris Texas" / "Lagos Nigeria": try trailing words as a qualifier before fuzzy matching.
+        words = name.split()
+        for split in range(len(words) - 1, 0, -1):
+            head, tail = " ".join(words[:split]), " ".join(words[split:])
+            if head in cls._names:
+                code = cls._pick(cls._names[head], tail)
+                if code:
+                    return code
+
+        return cls._lookup(name, None)
+
+    @classmethod
+    def resolve_many(cls, locations: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve several locations at once; unresolved names map to None."""
+        return {location: cls.resolve(location) for location in locations}
+
+    @classmethod
+    def find_places(cls, text: str, max_words: int = 3) -> List[Tuple[str, str]]:
+        """
+        (mention, code) pairs for places named in free text, in order of appearance.
+
+        Only exact names count, and they must be capitalised as written
+        ("Lagos", "New York"); upper-case three-letter words count when they are
+        known codes ("LOS"). Longer names win over the words inside them.
+        """
+        cls._load()
+        words = re.findall(r"[^\W\d_]+", text)
+        found: List[Tuple[str, str]] = []
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if len(word) == 3 and word.isupper() and (word in cls._airports or word in cls._cities):
+                found.append((word, word))
+                i += 1
+                continue
+            size = 0
+            if word[0].isupper():
+                for size in range(min(max_words, len(words) - i), 0, -1):
+                    group = words[i:i + size]
+                    entries = cls._names.get(fold(" ".join(group)))
+                    if entries and all(w[0].isupper() for w in group):
+                        found.append((" ".join(group), cls._pick(entries, None)))
+                        break
+                else:
+                    size = 0
+            i += max(size, 1)
+        return found
+
+    @classmethod
+    def airports_in(cls, city_code: str) -> List[str]:
+        """Airport codes grouped under a city code (LON -> LHR, LGW, ...)."""
+        cls._load()
+        return [a.code for a in cls._cities.get(city_code.upper(), [])]
+
+    @classmethod
+    def city_code(cls, location: str) -> Optional[str]:
+        """Resolve a location and map airport codes to their city code (LHR -> LON)."""
+        code = cls.resolve(location)
+        if code is None:
+            return None
+        cls._load()
+        airport = cls._airports.get(code)
+        return airport.city_code if airport else code
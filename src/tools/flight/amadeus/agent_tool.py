@@ -1,8 +1,17 @@
 import logging
 from typing import Dict, Any, Optional, List
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
+from src.broker.producer import JobProducer
+from src.configs.metrics import TOOL_ERRORS
+from src.context.session import session_id_from
+from src.tools.flight.airports import UnknownLocationError
 from src.tools.flight.amadeus.core import AmadeusFlightTool
-from src.schemas.order import CreateFlightOrder, FlightOffer
+from src.tools.flight.amadeus.offers import OfferStore
+from src.tools.flight.amadeus.projection import index_offers, project_offer, project_search_results
+from src.tools.flight.amadeus.ranking import OfferTable, parse_clock
+from src.schemas.traveller import TravellerObject
+from src.tools.jobs import booking_receipt
 
 
 logger = logging.getLogger(__name__)
@@ -20,6 +29,8 @@ class AgentFlightTool:
     LangChain tools wrapper for AmadeusFlightTool.
     Provides async tools for:
     - search_flights
+    - search_flights_flexible (price calendar around approximate dates)
+    - filter_flights (over the last search, without calling Amadeus)
     - get_flight_price
     - create_order
     """
@@ -31,7 +42,15 @@ class AgentFlightTool:
                 "Search for flights between an origin and a destination. "
                 "Optional parameters include departure and return dates, "
                 "number of adults, travel class, maximum price, and maximum number of results. "
-                "Returns a list of flight offers."
+                "Origin and destination may be IATA codes or city/airport names; add a region or "
+                "country after a comma to disambiguate (e.g. 'Paris, Texas'). "
+                "Offers can also be narrowed by max_stops (0 for non-stop) and outbound departure "
+                "time of day (depart_after / depart_before as HH:MM), and ordered with sort_by "
+                "(price, duration, stops or departure). "
+                "Returns matched and searched counts plus compact offer rows: each flight offer has an "
+                "offer_id, price, currency, carriers, seats and legs (from, to, depart, arrive, stops, "
+                "duration, flights); the cheapest, fastest and fewest-stop offers carry tags. "
+                "Without a destination, returns destinations: rows with dates and prices."
             )
         )
         async def search_flights(
@@ -42,10 +61,15 @@ class AgentFlightTool:
             adults: int = 1,
             travel_class: str = "ECONOMY",
             max_price: Optional[float] = None,
-            max_results: int = 10
-        ) -> List[Dict[str, Any]]:
+            max_results: int = 10,
+            max_stops: Optional[int] = None,
+            depart_after: Optional[str] = None,
+            depart_before: Optional[str] = None,
+            sort_by: str = "price",
+            config: RunnableConfig = None
+        ) -> Dict[str, Any]:
             try:
-                return await AmadeusFlightTool.search_flights(
+                results = await AmadeusFlightTool.search_flights(
                     origin=origin,
                     destination=destination,
                     departure_date=departure_date,
@@ -55,26 +79,241 @@ class AgentFlightTool:
                     max_price=max_price,
                     max_results=max_results
                 )
+                session_id = session_id_from(config)
+                if results and results[0].get("type") != "flight-offer":
+                    return {"destinations": project_search_results(session_id, results)}
+
+                table = index_offers(session_id, results)
+                matched = cls._matching(
+                    table,
+                    sort_by=sort_by,
+                    max_price=max_price,
+                    max_stops=max_stops,
+                    depart_after=depart_after,
+                    depart_before=depart_before,
+                )
+                return {
+                    "matched": len(matched),
+                    "searched": len(table),
+                    "offers": table.view(matched, cls._limit(max_results)),
+                }
+            except UnknownLocationError as e:
+                return {"error": f"{e}. Ask the traveler for the airport or a more specific city."}
+            except ValueError as e:
+                return {"error": str(e)}
             except Exception as e:
                 logger.error(f"search_flights_tool error: {e}")
-                return []
+                TOOL_ERRORS.inc("search_flights", "exception")
+                return {}
 
         return search_flights
 
+    @classmethod
+    def search_flights_flexible_tool(cls):
+        @tool(
+            description=(
+                "Search flights when the traveler's dates are approximate ('around the 5th of January'). "
+                "Searches every departure date within flex_days (default 3, at most 7) of departure_date in "
+                "one call and returns a price calendar: per date, the cheapest offer (offer_id, price, "
+                "stops, carriers, departure time) and the number of offers, plus the overall cheapest. "
+                "A date whose search failed carries an error instead of an offer count; it is not known "
+                "to have no flights. "
+                "With return_date the trip length is kept; set return_flex_days to vary the return too. "
+                "Given max_price, stops once a few dates at or under it are found. "
+                "Use this instead of calling search_flights once per date."
+            )
+        )
+        async def search_flights_flexible(
+            origin: str,
+            destination: str,
+            departure_date: str,
+            return_date: Optional[str] = None,
+            flex_days: int = 3,
+            return_flex_days: Optional[int] = None,
+            adults: int = 1,
+            travel_class: str = "ECONOMY",
+            max_price: Optional[float] = None,
+            config: RunnableConfig = None
+        ) -> Dict[str, Any]:
+            try:
+                result = await AmadeusFlightTool.search_flights_flexible(
+                    origin=origin,
+                    destination=destination,
+                    departure_date=departure_date,
+                    return_date=return_date,
+                    flex_days=flex_days,
+                    return_flex_days=return_flex_days,
+                    adults=adults,
+                    travel_class=travel_class,
+                    max_price=max_price,
+                )
+                session_id = session_id_from(config)
+                calendar = []
+                for day in result["calendar"]:
+                    row = {
+                        "departure_date": day["departure_date"],
+                        "return_date": day["return_date"],
+                    }
+                    if "error" in day:
+                        row["error"] = day["error"]
+                    else:
+                        row["offers"] = day["offers"]
+                    cheapest = day["cheapest"]
+                    if cheapest is not None:
+                        offer = project_offer(cheapest, OfferStore.put(session_id, cheapest))
+                        row.update({
+                            "offer_id": offer["offer_id"],
+                            "price": offer["price"],
+                            "currency": offer["currency"],
+                            "carriers": offer["carriers"],
+                            "stops": [leg.get("stops") for leg in offer["legs"]],
+                            "depart": offer["legs"][0].get("depart") if offer["legs"] else None,
+                        })
+                    calendar.append(row)
+
+                priced = [row for row in calendar if "price" in row]
+                return {
+                    "calendar": calendar,
+                    "cheapest": min(priced, key=lambda row: float(row["price"]), default=None),
+                    "searched": result["searched"],
+                    "failed": result["failed"],
+                    "skipped": result["skipped"],
+                }
+            except UnknownLocationError as e:
+                return {"error": f"{e}. Ask the traveler for the airport or a more specific city."}
+            except ValueError as e:
+                return {"error": str(e)}
+            except Exception as e:
+                logger.error(f"search_flights_flexible_tool error: {e}")
+                TOOL_ERRORS.inc("search_flights_flexible", "exception")
+                return {}
+
+        return search_flights_flexible
+
+    @classmethod
+    def filter_flights_tool(cls):
+        @tool(
+            description=(
+                "Filter and re-rank the offers of the latest search_flights call without searching again. "
+                "Use it for follow-ups such as 'cheapest non-stop after 6pm' or 'only British Airways'. "
+                "Parameters (all optional): max_price, max_stops (0 = non-stop), max_duration_hours, "
+                "depart_after / depart_before / arrive_before (outbound, HH:MM), carriers (IATA airline codes), "
+                "sort_by (price, duration, stops or departure), pareto_only (only offers no other offer beats "
+                "on price, duration and stops together) and limit. "
+                "Returns matched and searched counts plus offer rows with their offer_id."
+            )
+        )
+        async def filter_flights(
+            max_price: Optional[float] = None,
+            max_stops: Optional[int] = None,
+            max_duration_hours: Optional[float] = None,
+            depart_after: Optional[str] = None,
+            depart_before: Optional[str] = None,
+            arrive_before: Optional[str] = None,
+            carriers: Optional[List[str]] = None,
+            sort_by: str = "price",
+            pareto_only: bool = False,
+            limit: int = 10,
+            config: RunnableConfig = None
+        ) -> Dict[str, Any]:
+            try:
+                table = OfferStore.last_search(session_id_from(config))
+                if table is None:
+                    return {"error": "No recent flight search to filter. Run search_flights first."}
+
+                matched = cls._matching(
+                    table,
+                    sort_by=sort_by,
+                    pareto_only=pareto_only,
+                    max_price=max_price,
+                    max_stops=max_stops,
+                    max_duration=round(float(max_duration_hours) * 60) if max_duration_hours else None,
+                    depart_after=depart_after,
+                    depart_before=depart_before,
+                    arrive_before=arrive_before,
+                    carriers=carriers,
+                )
+                return {
+                    "matched": len(matched),
+                    "searched": len(table),
+                    "offers": table.view(matched, cls._limit(limit)),
+                }
+            except ValueError as e:
+                return {"error": str(e)}
+            except Exception as e:
+                logger.error(f"filter_flights_tool error: {e}")
+                TOOL_ERRORS.inc("filter_flights", "exception")
+                return {}
+
+        return filter_flights
+
+    @staticmethod
+    def _matching(
+        table: OfferTable,
+        *,
+        sort_by: str = "price",
+        pareto_only: bool = False,
+        max_price: Optional[float] = None,
+        max_stops: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        depart_after: Optional[str] = None,
+        depart_before: Optional[str] = None,
+        arrive_before: Optional[str] = None,
+        carriers: Optional[List[str]] = None,
+    ) -> List[int]:
+        """Row indices of `table` matching the tool arguments, ranked by `sort_by`."""
+        def number(value, cast):
+            return cast(value) if value not in (None, "", "None") else None
+
+        selected = table.select(
+            max_price=number(max_price, float),
+            max_stops=number(max_stops, int),
+            max_duration=number(max_duration, int),
+            depart_after=parse_clock(depart_after),
+            depart_before=parse_clock(depart_before),
+            arrive_before=parse_clock(arrive_before),
+            carriers=[carriers] if isinstance(carriers, str) else carriers,
+        )
+        if pareto_only:
+            selected = table.pareto(selected)
+        return table.rank(selected, (sort_by or "price").lower())
+
+    @staticmethod
+    def _limit(value: Any, default: int = 10) -> int:
+        try:
+            return max(1, int(value))
+        except (ValueError, TypeError):
+            return default
+
     @classmethod
     def get_flight_price_tool(cls):
         @tool(
             description=(
-                "Get detailed pricing for a specific flight offer. "
-                "Input should be a flight offer object returned from search_flights. "
-                "Returns the pricing details including total cost, taxes, and fare breakdown."
+                "Get confirmed pricing for a flight offer returned by search_flights. "
+                "Input is the offer_id from the search results. "
+                "Returns the priced offer row including total cost, base fare and currency."
             )
         )
-        async def get_flight_price(flight_offer: FlightOffer) -> Dict:
+        async def get_flight_price(offer_id: str, config: RunnableConfig) -> Dict:
             try:
-                return await AmadeusFlightTool.get_flight_price(flight_offer)
+                session_id = session_id_from(config)
+                offer = OfferStore.get(session_id, offer_id)
+                if offer is None:
+                    return cls._unknown_offer(offer_id)
+
+                response = await AmadeusFlightTool.get_flight_price(offer)
+                priced = (response.get("data", {}).get("flightOffers") or [None])[0]
+                if priced is None:
+                    return {}
+
+                # Keep the priced offer under the same handle so booking uses confirmed fares.
+                OfferStore.put(session_id, priced, handle=offer_id)
+                row = project_offer(priced, offer_id)
+                row["base"] = priced.get("price", {}).get("base")
+                return row
             except Exception as e:
                 logger.error(f"get_flight_price_tool error: {e}")
+                TOOL_ERRORS.inc("get_flight_price", "exception")
                 return {}
 
         return get_flight_price
@@ -83,16 +322,40 @@ class AgentFlightTool:
     def create_order_tool(cls):
         @tool(
             description=(
-                "Create a flight order using provided order information. "
-                "Input should be a CreateFlightOrder object with passenger and flight details. "
-                "Returns the confirmed booking details or error information."
-            )
+                "Create a flight order for a flight offer returned by search_flights or get_flight_price. "
+                "Input is the offer_id and the list of travelers (name, date of birth, gender, "
+                "contact and passport details). "
+                "The booking runs in the background: returns a job_id and its status; "
+                "use booking_status with the job_id to get the confirmation."
+            ),
+            response_format="content_and_artifact",
         )
-        async def create_order(order_info: CreateFlightOrder) -> Dict:
+        async def create_order(offer_id: str, travelers: List[TravellerObject], config: RunnableConfig):
             try:
-                return await AmadeusFlightTool.create_order(order_info)
+                session_id = session_id_from(config)
+                offer = OfferStore.get(session_id, offer_id)
+                if offer is None:
+                    return cls._unknown_offer(offer_id), None
+
+                job = await JobProducer.submit(
+                    "flight_order",
+                    {
+                        "data": {
+                            "type": "flight-order",
+                            "flightOffers": [offer],
+                            "travelers": [t.model_dump(mode="json") for t in travelers],
+                        }
+                    },
+                    session_id=session_id,
+                )
+                return booking_receipt(job), {"job_id": job.id}
             except Exception as e:
                 logger.error(f"create_order_tool error: {e}")
-                return {}
+                TOOL_ERRORS.inc("create_order", "exception")
+                return {}, None
 
         return create_order
+
+    @staticmethod
+    def _unknown_offer(offer_id: str) -> Dict[str, str]:
+        return {"error": f"Unknown or expired offer_id '{offer_id}'. Run search_flights again."}
@@ -1,10 +1,24 @@
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
-from src.configs.http import AsyncHTTPRequest, Methods
-from src.tools.flight.amadeus.auth import AmadeusAuth
-from src.configs.env import AMADEUS_BASE_URL
-from src.schemas.order import CreateFlightOrder, FlightOffer
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date, datetime, timedelta
+from src.configs.http import Methods
+from src.auth.amadeus import AmadeusAuth
+from src.cache.memory import TTLCache
+from src.schemas.serialization import dump_json
+from src.tools.flight.airports import AirportIndex, UnknownLocationError
+from src.configs.env import (
+    AMADEUS_BASE_URL,
+    FLIGHT_OFFERS_CACHE_TTL,
+    FLIGHT_DESTINATIONS_CACHE_TTL,
+    FLIGHT_CACHE_STALE_TTL,
+    FLIGHT_CACHE_MAX_ENTRIES,
+    FLIGHT_CACHE_MAX_BYTES,
+    FLIGHT_SEARCH_FETCH_MAX,
+    FLIGHT_FLEX_CONCURRENCY,
+    FLIGHT_FLEX_MAX_DAYS,
+    FLIGHT_FLEX_MAX_SEARCHES,
+)
 from langchain_core.tools import tool
 
 # --- Logger setup ---
@@ -17,52 +31,35 @@ if not logger.handlers:
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
-CITY_TO_IATA = {
-    "lagos": "LOS",
-    "london": "LHR",
-    "new york": "JFK",
-    "paris": "CDG",
-    "tokyo": "NRT",
-    "dubai": "DXB",
-    "los angeles": "LAX",
-    "san francisco": "SFO",
-    "toronto": "YYZ",
-    "sydney": "SYD",
-    "mumbai": "BOM",
-    "delhi": "DEL",
-    "singapore": "SIN",
-    "hong kong": "HKG",
-    "bangkok": "BKK",
-}
+# Largest page the flight-offers endpoint returns.
+AMADEUS_MAX_OFFERS = 250
 
 
 class AmadeusFlightTool:
+    _offers_cache = TTLCache(
+        name="flight-offers",
+        ttl=FLIGHT_OFFERS_CACHE_TTL,
+        stale_ttl=FLIGHT_CACHE_STALE_TTL,
+        max_entries=FLIGHT_CACHE_MAX_ENTRIES,
+        max_bytes=FLIGHT_CACHE_MAX_BYTES,
+    )
+    _destinations_cache = TTLCache(
+        name="flight-destinations",
+        ttl=FLIGHT_DESTINATIONS_CACHE_TTL,
+        stale_ttl=FLIGHT_CACHE_STALE_TTL,
+        max_entries=FLIGHT_CACHE_MAX_ENTRIES,
+        max_bytes=FLIGHT_CACHE_MAX_BYTES,
+    )
 
     @staticmethod
-    def _to_iata_code(location: str) -> str:
-        """Convert city/country name to IATA code if possible."""
-        try:
-            if not location:
-                return location
-            
-            location_clean = location.strip().upper()
-            if len(location_clean) == 3 and location_clean.isalpha():
-                return location_clean
-
-            location_lower = location.lower().strip()
-            for city, code in CITY_TO_IATA.items():
-                if city in location_lower or location_lower in city:
-                    return code
-            
-            # Fallback: first 3 letters
-            words = location.split()
-            if words and len(words[0]) >= 3:
-                return words[0][:3].upper()
-            
-            return location
-        except Exception as e:
-            logger.error(f"Error converting location '{location}' to IATA: {e}")
+    def _to_iata_code(location: Optional[str]) -> Optional[str]:
+        """Convert a city/airport name to an IATA code using the offline airport index."""
+        if not location:
             return location
+        code = AirportIndex.resolve(location)
+        if code is None:
+            raise UnknownLocationError(location)
+        return code
 
     @staticmethod
     def _normalize_date(date_str: str, return_date: Optional[str] = None) -> str:
@@ -90,6 +87,54 @@ class AmadeusFlightTool:
             logger.warning(f"Failed to normalize date '{date_str}': {e}")
             return date_str
 
+    @classmethod
+    async def _cached_get(cls, cache: TTLCache, url: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """GET `url` through `cache`, keyed on the normalized query parameters."""
+        async def fetch():
+            response = await AmadeusAuth.request(
+                method=Methods.GET, url=url, params=params, coalesce=True
+            )
+            return response.get("data", [])
+
+        return await cache.get_or_fetch(cls._cache_key(url, params), fetch)
+
+    @staticmethod
+    def _cache_key(url: str, params: Dict[str, Any]) -> Tuple:
+        return url, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    @staticmethod
+    def _offer_params(
+        origin: str,
+        destination: str,
+        departure_date: Optional[str],
+        return_date: Optional[str],
+        adults: int,
+        travel_class: str,
+        max_results: int,
+    ) -> Dict[str, Any]:
+        params = {
+            "originLocationCode": origin,
+            "destinationLocationCode": destination,
+            "adults": adults,
+            "travelClass": travel_class.upper(),
+            "currencyCode": "USD",
+            # Fetch a wide page once; callers filter and rank it locally.
+            "max": min(max(max_results, FLIGHT_SEARCH_FETCH_MAX), AMADEUS_MAX_OFFERS)
+        }
+        if departure_date:
+            params["departureDate"] = departure_date
+        if return_date:
+            params["returnDate"] = return_date
+        return params
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters for the flight search caches."""
+        return {
+            cls._offers_cache.name: cls._offers_cache.stats(),
+            cls._destinations_cache.name: cls._destinations_cache.stats(),
+        }
+
     @classmethod
     async def search_flights(
         cls,
@@ -102,10 +147,8 @@ class AmadeusFlightTool:
         max_price: Optional[float] = None,
         max_results: int = 10
     ) -> List[Dict[str, Any]]:
-        """Fetch flight offers or destinations."""
+        """Fetch flight offers or destinations. Raises UnknownLocationError for unresolvable places."""
         try:
-            token = await AmadeusAuth.get_token()
-
             def clean_param(val):
                 if val is None or str(val).strip() in ("None", ""):
                     return None
@@ -135,26 +178,13 @@ class AmadeusFlightTool:
                 max_results = 10
 
             if destination:
-                params = {
-                    "originLocationCode": origin,
-                    "destinationLocationCode": destination,
-                    "adults": adults,
-                    "travelClass": travel_class.upper(),
-                    "currencyCode": "USD",
-                    "max": max_results
-                }
-                if departure_date:
-                    params["departureDate"] = departure_date
-                if return_date:
-                    params["returnDate"] = return_date
-
-                response = await AsyncHTTPRequest.request(
-                    method=Methods.GET,
-                    url=f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers",
-                    headers={"Authorization": f"Bearer {token}"},
-                    params=params
+                return await cls._cached_get(
+                    cls._offers_cache,
+                    f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers",
+                    cls._offer_params(
+                        origin, destination, departure_date, return_date, adults, travel_class, max_results
+                    )
                 )
-                return response.get("data", [])
 
             else:
                 params = {"origin": origin}
@@ -165,55 +195,196 @@ class AmadeusFlightTool:
                 if return_date:
                     params["returnDate"] = return_date
 
-                response = await AsyncHTTPRequest.request(
-                    method=Methods.GET,
-                    url=f"{AMADEUS_BASE_URL}/v1/shopping/flight-destinations",
-                    headers={"Authorization": f"Bearer {token}"},
-                    params=params
+                return await cls._cached_get(
+                    cls._destinations_cache,
+                    f"{AMADEUS_BASE_URL}/v1/shopping/flight-destinations",
+                    params
                 )
-                return response.get("data", [])
 
+        except UnknownLocationError:
+            raise
         except Exception as e:
             logger.error(f"Search flights failed: {e}")
             return []
 
+    @staticmethod
+    def _offer_price(offer: Dict[str, Any]) -> float:
+        price = offer.get("price", {})
+        return float(price.get("grandTotal") or price.get("total") or "inf")
+
+    @staticmethod
+    def _flex_dates(
+        departure: date,
+        return_: Optional[date],
+        flex_days: int,
+        return_flex_days: Optional[int],
+    ) -> List[Tuple[date, Optional[date]]]:
+        """(departure, return) pairs within the window, closest to the requested dates first."""
+        today = date.today()
+        pairs = []
+        for shift in range(-flex_days, flex_days + 1):
+            out = departure + timedelta(days=shift)
+            if out < today:
+                continue
+            if return_ is None:
+                pairs.append((abs(shift), out, None))
+            elif return_flex_days is None:
+                # Keep the trip length when only the departure is flexible.
+                pairs.append((abs(shift), out, return_ + timedelta(days=shift)))
+            else:
+                for back_shift in range(-return_flex_days, return_flex_days + 1):
+                    back = return_ + timedelta(days=back_shift)
+                    if back >= out:
+                        pairs.append((abs(shift) + abs(back_shift), out, back))
+        pairs.sort(key=lambda p: (p[0], p[1], p[2] or p[1]))
+        return [(out, back) for _, out, back in pairs]
+
+    @classmethod
+    async def search_flights_flexible(
+        cls,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        flex_days: int = 3,
+        return_flex_days: Optional[int] = None,
+        adults: int = 1,
+        travel_class: str = "ECONOMY",
+        max_price: Optional[float] = None,
+        enough: int = 3,
+    ) -> Dict[str, Any]:
+        """
+        Cheapest offer per date pair across a ±`flex_days` window around the requested dates.
+
+        With a return date the trip length is kept unless `return_flex_days`
+        widens the return window too. Days are searched closest first, at most
+        FLIGHT_FLEX_CONCURRENCY at a time and FLIGHT_FLEX_MAX_SEARCHES in total,
+        with days already in the search cache taken first. Given `max_price`,
+        the fan-out stops once `enough` days are at or under it.
+
+        Returns `calendar` rows (dates, cheapest offer or None, offer count;
+        a day whose search failed has an `error` instead of a count), the
+        `searched`, `failed` and `skipped` day counts, and whether it `stopped_early`.
+        Raises UnknownLocationError for unresolvable places and ValueError for
+        bad dates or a window entirely in the past.
+        """
+        origin = cls._to_iata_code(origin)
+        destination = cls._to_iata_code(destination)
+        if not (origin and destination and departure_date):
+            raise ValueError("Flexible search needs an origin, a destination and a departure date")
+        try:
+            departure = date.fromisoformat(cls._normalize_date(departure_date, return_date))
+            return_ = date.fromisoformat(cls._normalize_date(return_date)) if return_date else None
+        except ValueError:
+            raise ValueError("Dates must be given as YYYY-MM-DD")
+        adults = int(adults or 1)
+        travel_class = travel_class or "ECONOMY"
+        flex_days = max(0, min(int(flex_days), FLIGHT_FLEX_MAX_DAYS))
+        if return_flex_days is not None:
+            return_flex_days = max(0, min(int(return_flex_days), FLIGHT_FLEX_MAX_DAYS))
+
+        pairs = cls._flex_dates(departure, return_, flex_days, return_flex_days)
+        if not pairs:
+            raise ValueError("All dates in the window are in the past; ask the traveler for upcoming dates")
+        skipped = max(0, len(pairs) - FLIGHT_FLEX_MAX_SEARCHES)
+        pairs = pairs[:FLIGHT_FLEX_MAX_SEARCHES]
+
+        url = f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers"
+
+        def day_params(pair: Tuple[date, Optional[date]]) -> Dict[str, Any]:
+            return cls._offer_params(
+                origin, destination, pair[0].isoformat(), pair[1] and pair[1].isoformat(),
+                adults, travel_class, FLIGHT_SEARCH_FETCH_MAX,
+            )
+
+        def cached(pair: Tuple[date, Optional[date]]) -> bool:
+            return cls._offers_cache.get(cls._cache_key(url, day_params(pair))) is not None
+
+        # Stable sort: cached days first, otherwise closest first.
+        pairs.sort(key=lambda pair: not cached(pair))
+
+        semaphore = asyncio.Semaphore(FLIGHT_FLEX_CONCURRENCY)
+        enough_found = asyncio.Event()
+        results: Dict[Tuple[date, Optional[date]], List[Dict[str, Any]]] = {}
+        failed: Dict[Tuple[date, Optional[date]], str] = {}
+        cheap_days = 0
+
+        async def search_day(pair: Tuple[date, Optional[date]]) -> None:
+            nonlocal cheap_days
+            async with semaphore:
+                if enough_found.is_set():
+                    return
+                try:
+                    offers = await cls._cached_get(cls._offers_cache, url, day_params(pair))
+                except Exception as e:
+                    # Kept apart from empty days so a throttled or timed-out search never reads as "no flights".
+                    status = getattr(getattr(e, "response", None), "status_code", None)
+                    logger.warning(f"Flexible search for {pair[0]} failed: {e!r}")
+                    failed[pair] = f"Search failed ({f'HTTP {status}' if status else type(e).__name__}); retry this date"
+                    return
+            results[pair] = offers
+            if max_price is not None and offers and min(map(cls._offer_price, offers)) <= float(max_price):
+                cheap_days += 1
+                if cheap_days >= enough:
+                    enough_found.set()
+
+        await asyncio.gather(*(search_day(pair) for pair in pairs))
+
+        calendar = []
+        for out, back in sorted([*results, *failed], key=lambda pair: (pair[0], pair[1] or pair[0])):
+            row = {
+                "departure_date": out.isoformat(),
+                "return_date": back.isoformat() if back else None,
+                "cheapest": None,
+            }
+            if (out, back) in failed:
+                row["error"] = failed[(out, back)]
+            else:
+                offers = results[(out, back)]
+                row["cheapest"] = min(offers, key=cls._offer_price) if offers else None
+                row["offers"] = len(offers)
+            calendar.append(row)
+        return {
+            "calendar": calendar,
+            "searched": len(results),
+            "failed": len(failed),
+            "skipped": skipped + len(pairs) - len(results) - len(failed),
+            "stopped_early": enough_found.is_set(),
+        }
+
     @classmethod
-    async def get_flight_price(cls, flight_offer: FlightOffer) -> Dict:
-        """Get pricing for a flight offer."""
+    async def get_flight_price(cls, flight_offer: Dict[str, Any]) -> Dict:
+        """Get pricing for a flight offer exactly as returned by search_flights."""
         try:
-            token = await AmadeusAuth.get_token()
-            return await AsyncHTTPRequest.request(
+            return await AmadeusAuth.request(
                 method=Methods.POST,
                 url=f"{AMADEUS_BASE_URL}/v1/shopping/flight-offers/pricing",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                json={
+                headers={"Content-Type": "application/json"},
+                content=dump_json({
                     "data": {
                         "type": "flight-offers-pricing",
                         "flightOffers": [flight_offer]
                     }
-                }
+                })
             )
         except Exception as e:
             logger.error(f"Get flight price failed: {e}")
             return {}
 
     @classmethod
-    async def create_order(cls, order_info: CreateFlightOrder) -> Dict:
-        """Create a flight order."""
+    async def create_order(cls, order_info: Dict[str, Any]) -> Dict:
+        """
+        Create a flight order from a CreateFlightOrder-shaped payload.
+
+        Errors propagate so the booking job can decide whether to retry.
+        """
         try:
-            token = await AmadeusAuth.get_token()
-            return await AsyncHTTPRequest.request(
+            return await AmadeusAuth.request(
                 method=Methods.POST,
                 url=f"{AMADEUS_BASE_URL}/v1/booking/flight-orders",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                json=order_info
+                headers={"Content-Type": "application/json"},
+                content=dump_json(order_info)
             )
         except Exception as e:
             logger.error(f"Create flight order failed: {e}")
-            return {}
+            raise
@@ -0,0 +1,59 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+import orjson
+
+from src.cache.memory import TTLCache
+from src.configs.env import FLIGHT_OFFER_STORE_TTL, FLIGHT_OFFER_STORE_MAX_ENTRIES, SESSION_MAX_SESSIONS
+from src.tools.flight.amadeus.ranking import OfferTable
+
+
+class OfferStore:
+    """
+    Full Amadeus flight offers kept server-side, addressed by session and a short handle.
+
+    Handles are derived from the offer content, so the same offer returned by
+    a repeated (or cached) search always maps to the same handle. Offers are
+    scoped to the session that searched for them.
+
+    The latest offer search of each session is also kept as an OfferTable,
+    so it can be filtered and re-ranked without searching again.
+    """
+
+    _offers = TTLCache(
+        name="flight-offer-store",
+        ttl=FLIGHT_OFFER_STORE_TTL,
+        max_entries=FLIGHT_OFFER_STORE_MAX_ENTRIES,
+        max_bytes=256 * 1024 * 1024,
+    )
+    _searches = TTLCache(
+        name="flight-search-tables",
+        ttl=FLIGHT_OFFER_STORE_TTL,
+        max_entries=SESSION_MAX_SESSIONS,
+        max_bytes=64 * 1024 * 1024,
+        sizeof=OfferTable.nbytes,
+    )
+
+    @staticmethod
+    def handle_for(offer: Dict[str, Any]) -> str:
+        return hashlib.sha1(orjson.dumps(offer, option=orjson.OPT_SORT_KEYS)).hexdigest()[:10]
+
+    @classmethod
+    def put(cls, session_id: str, offer: Dict[str, Any], handle: Optional[str] = None) -> str:
+        """Store `offer` for the session, under `handle` when replacing an offer (e.g. after pricing)."""
+        handle = handle or cls.handle_for(offer)
+        cls._offers.set((session_id, handle), offer)
+        return handle
+
+    @classmethod
+    def get(cls, session_id: str, handle: str) -> Optional[Dict[str, Any]]:
+        return cls._offers.get((session_id, handle.strip()))
+
+    @classmethod
+    def put_search(cls, session_id: str, table: OfferTable) -> None:
+        """Remember `table` as the session's latest offer search."""
+        cls._searches.set(session_id, table)
+
+    @classmethod
+    def last_search(cls, session_id: str) -> Optional[OfferTable]:
+        return cls._searches.get(session_id)
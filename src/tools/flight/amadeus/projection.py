@@ -0,0 +1,68 @@
+from typing import Any, Dict, List
+
+from src.tools.flight.amadeus.offers import OfferStore
+from src.tools.flight.amadeus.ranking import OfferTable
+
+
+def _leg(itinerary: Dict[str, Any]) -> Dict[str, Any]:
+    segments = itinerary.get("segments", [])
+    if not segments:
+        return {"duration": itinerary.get("duration")}
+    first, last = segments[0], segments[-1]
+    return {
+        "from": first["departure"]["iataCode"],
+        "to": last["arrival"]["iataCode"],
+        "depart": first["departure"]["at"],
+        "arrive": last["arrival"]["at"],
+        "stops": len(segments) - 1 + sum(s.get("numberOfStops", 0) for s in segments),
+        "duration": itinerary.get("duration"),
+        "flights": [f"{s['carrierCode']}{s['number']}" for s in segments],
+    }
+
+
+def project_offer(offer: Dict[str, Any], handle: str) -> Dict[str, Any]:
+    """Reduce one flight-offers result to the row the model needs to compare and choose."""
+    price = offer.get("price", {})
+    carriers = sorted({
+        segment["carrierCode"]
+        for itinerary in offer.get("itineraries", [])
+        for segment in itinerary.get("segments", [])
+    })
+    return {
+        "offer_id": handle,
+        "price": price.get("grandTotal") or price.get("total"),
+        "currency": price.get("currency"),
+        "carriers": carriers,
+        "seats": offer.get("numberOfBookableSeats"),
+        "legs": [_leg(itinerary) for itinerary in offer.get("itineraries", [])],
+    }
+
+
+def project_destination(destination: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce one flight-destinations result to destination, dates and price."""
+    return {
+        "destination": destination.get("destination"),
+        "departure_date": destination.get("departureDate"),
+        "return_date": destination.get("returnDate"),
+        "price": destination.get("price", {}).get("total"),
+    }
+
+
+def index_offers(session_id: str, offers: List[Dict[str, Any]]) -> OfferTable:
+    """Store full offers for the session and remember their table as its latest search."""
+    rows = [project_offer(offer, OfferStore.put(session_id, offer)) for offer in offers]
+    table = OfferTable.build(offers, rows)
+    OfferStore.put_search(session_id, table)
+    return table
+
+
+def project_search_results(session_id: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Store full offers server-side for the session and return compact rows for the model.
+
+    flight-offers results become offer rows addressed by `offer_id` (see
+    `index_offers`); flight-destinations results become destination rows.
+    """
+    if results and results[0].get("type") == "flight-offer":
+        return index_offers(session_id, results).rows
+    return [project_destination(result) for result in results]
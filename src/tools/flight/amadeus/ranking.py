@@ -0,0 +1,196 @@
+import re
+import sys
+from array import array
+from itertools import compress
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import orjson
+
+_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+_CLOCK = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*$", re.IGNORECASE)
+
+# Ordering for each `sort_by`; ties fall through to the next column.
+SORT_COLUMNS = {
+    "price": ("price", "duration", "stops"),
+    "duration": ("duration", "price", "stops"),
+    "stops": ("stops", "price", "duration"),
+    "departure": ("depart", "price", "duration"),
+}
+# Objectives a traveller trades off; an offer is Pareto-optimal if no other offer beats it on all three.
+PARETO_COLUMNS = ("price", "duration", "stops")
+
+
+def parse_duration(value: Optional[str]) -> int:
+    """Minutes in an ISO-8601 duration such as "PT14H10M" or "P1DT2H"; 0 when absent or malformed."""
+    match = _DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(g) if g else 0 for g in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def parse_clock(value: Any) -> Optional[int]:
+    """Minute of the day for "18:00", "6pm", "6:30 PM" or an hour number; None when empty."""
+    if value is None or str(value).strip() in ("", "None"):
+        return None
+    match = _CLOCK.match(str(value))
+    if not match:
+        raise ValueError(f"Unrecognised time of day '{value}'; use HH:MM")
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        raise ValueError(f"Unrecognised time of day '{value}'; use HH:MM")
+    return hour * 60 + minute
+
+
+def _minute_of_day(at: str) -> int:
+    # Amadeus local times: "2026-11-02T18:45:00".
+    return int(at[11:13]) * 60 + int(at[14:16]) if len(at) >= 16 else -1
+
+
+class OfferTable:
+    """
+    Flight offers of one search, parsed once into columns for local filtering and ranking.
+
+    Numeric columns are stdlib `array`s indexed by row; filters build a byte
+    mask one column at a time and rankings sort row indices by column values,
+    so follow-up questions ("cheapest non-stop after 6pm") are answered from
+    memory without another upstream call. Rows are the compact projections
+    already shown to the model, addressed by their offer_id.
+    """
+
+    __slots__ = ("rows", "price", "duration", "stops", "depart", "arrive", "return_depart", "carriers")
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.price = array("d")
+        self.duration = array("l")
+        self.stops = array("l")
+        self.depart = array("l")
+        self.arrive = array("l")
+        self.return_depart = array("l")
+        self.carriers: List[FrozenSet[str]] = []
+
+    @classmethod
+    def build(cls, offers: Sequence[Dict[str, Any]], rows: List[Dict[str, Any]]) -> "OfferTable":
+        """Columns for `offers`; `rows` are their projections in the same order."""
+        table = cls(rows)
+        for offer in offers:
+            price = offer.get("price", {})
+            itineraries = offer.get("itineraries", [])
+            segments = [it.get("segments", []) for it in itineraries]
+            table.price.append(float(price.get("grandTotal") or price.get("total") or "inf"))
+            table.duration.append(sum(parse_duration(it.get("duration")) for it in itineraries))
+            table.stops.append(max(
+                (len(legs) - 1 + sum(s.get("numberOfStops", 0) for s in legs) for legs in segments if legs),
+                default=0,
+            ))
+            outbound = segments[0] if segments else []
+            table.depart.append(_minute_of_day(outbound[0]["departure"]["at"]) if outbound else -1)
+            table.arrive.append(_minute_of_day(outbound[-1]["arrival"]["at"]) if outbound else -1)
+            inbound = segments[1] if len(segments) > 1 else []
+            table.return_depart.append(_minute_of_day(inbound[0]["departure"]["at"]) if inbound else -1)
+            table.carriers.append(frozenset(s["carrierCode"] for legs in segments for s in legs))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def nbytes(self) -> int:
+        """Approximate memory held, for the byte bound of the cache that stores tables."""
+        columns = (self.price, self.duration, self.stops, self.depart, self.arrive, self.return_depart)
+        return sum(c.itemsize * len(c) for c in columns) + len(orjson.dumps(self.rows)) + sys.getsizeof(self.carriers)
+
+    def select(
+        self,
+        *,
+        max_price: Optional[float] = None,
+        max_stops: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        depart_after: Optional[int] = None,
+        depart_before: Optional[int] = None,
+        arrive_after: Optional[int] = None,
+        arrive_before: Optional[int] = None,
+        return_after: Optional[int] = None,
+        carriers: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """Indices of rows matching every given bound; times are minutes of the day, durations minutes."""
+        mask = bytearray(b"\x01") * len(self)
+
+        def keep(column: Sequence[float], test) -> None:
+            nonlocal mask
+            mask = bytearray(m and test(v) for m, v in zip(mask, column))
+
+        if max_price is not None:
+            keep(self.price, lambda v: v <= max_price)
+        if max_stops is not None:
+            keep(self.stops, lambda v: v <= max_stops)
+        if max_duration is not None:
+            keep(self.duration, lambda v: v <= max_duration)
+        if depart_after is not None:
+            keep(self.depart, lambda v: v >= depart_after)
+        if depart_before is not None:
+            keep(self.depart, lambda v: 0 <= v <= depart_before)
+        if arrive_after is not None:
+            keep(self.arrive, lambda v: v >= arrive_after)
+        if arrive_before is not None:
+            keep(self.arrive, lambda v: 0 <= v <= arrive_before)
+        if return_after is not None:
+            keep(self.return_depart, lambda v: v >= return_after)
+        if carriers:
+            wanted = {c.strip().upper() for c in carriers if c and c.strip()}
+            if wanted:
+                keep(self.carriers, lambda v: not wanted.isdisjoint(v))
+        return list(compress(range(len(self)), mask))
+
+    def rank(self, indices: Iterable[int], sort_by: str = "price") -> List[int]:
+        """`indices` ordered by `sort_by` (price, duration, stops or departure)."""
+        names = SORT_COLUMNS.get(sort_by)
+        if names is None:
+            raise ValueError(f"Unknown sort_by '{sort_by}'; use one of {', '.join(SORT_COLUMNS)}")
+        columns = [getattr(self, name) for name in names]
+        return sorted(indices, key=lambda i: tuple(column[i] for column in columns))
+
+    def pareto(self, indices: Iterable[int]) -> List[int]:
+        """
+        Rows not dominated on price, duration and stops, cheapest first.
+
+        After a lexicographic sort any dominating row comes before the rows
+        it dominates, so one sweep against the front found so far suffices.
+        """
+        columns = [getattr(self, name) for name in PARETO_COLUMNS]
+        front: List[int] = []
+        points: List[tuple] = []
+        for i in sorted(indices, key=lambda i: tuple(column[i] for column in columns)):
+            point = tuple(column[i] for column in columns)
+            if not any(all(a <= b for a, b in zip(kept, point)) for kept in points):
+                front.append(i)
+                points.append(point)
+        return front
+
+    def highlights(self, indices: Sequence[int]) -> Dict[int, List[str]]:
+        """Tags for the cheapest, fastest and fewest-stop rows among `indices`."""
+        tags: Dict[int, List[str]] = {}
+        if not indices:
+            return tags
+        for tag, names in (
+            ("cheapest", SORT_COLUMNS["price"]),
+            ("fastest", SORT_COLUMNS["duration"]),
+            ("fewest_stops", SORT_COLUMNS["stops"]),
+        ):
+            columns = [getattr(self, name) for name in names]
+            best = min(indices, key=lambda i: tuple(column[i] for column in columns))
+            tags.setdefault(best, []).append(tag)
+        return tags
+
+    def view(self, indices: Sequence[int], limit: int) -> List[Dict[str, Any]]:
+        """Rows for the first `limit` of `indices`, tagged with the highlights of the whole selection."""
+        tags = self.highlights(indices)
+        rows = []
+        for i in indices[:limit]:
+            row = self.rows[i]
+            rows.append({**row, "tags": tags[i]} if i in tags else row)
+        return rows
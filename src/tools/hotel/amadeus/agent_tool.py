@@ -1,7 +1,12 @@
 import logging
 from typing import List, Optional
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
+from src.broker.producer import JobProducer
+from src.configs.metrics import TOOL_ERRORS
+from src.context.session import session_id_from
 from src.tools.hotel.amadeus.core import AmadeusHotelTool
+from src.tools.jobs import booking_receipt
 from src.schemas.hotel import HotelOrderSchema, GeoCode
 
 # --- Logger setup ---
@@ -22,6 +27,7 @@ class AgentHotelTool:
     - fetch hotel data
     - fetch hotel ratings
     - fetch hotel offers
+    - search hotels (fetch + ratings + offers in one call)
     - book hotels
     """
 
@@ -43,6 +49,7 @@ class AgentHotelTool:
                 return await AmadeusHotelTool.fetch(hotel_id=hotel_id, geo_code=geo_code, city_code=city_code)
             except Exception as e:
                 logger.error(f"fetch_hotel_tool error: {e}")
+                TOOL_ERRORS.inc("fetch", "exception")
                 return {}
 
         return fetch
@@ -60,6 +67,7 @@ class AgentHotelTool:
                 return await AmadeusHotelTool.rating(hotel_ids=hotel_ids)
             except Exception as e:
                 logger.error(f"fetch_hotel_rating_tool error: {e}")
+                TOOL_ERRORS.inc("rating", "exception")
                 return {}
 
         return rating
@@ -68,33 +76,89 @@ class AgentHotelTool:
     def offer_tool(cls):
         @tool(
             description=(
-                "Fetch hotel offers for a given hotel ID and number of adults. "
+                "Fetch hotel offers for one or more hotel IDs and number of adults. "
+                "Pass every hotel to compare in a single call; optional check-in and "
+                "check-out dates use YYYY-MM-DD. "
                 "Returns available room offers including prices and availability."
             )
         )
-        async def offer(hotel_id: str, adult_count: int = 1):
+        async def offer(
+            hotel_ids: List[str],
+            adult_count: int = 1,
+            check_in_date: Optional[str] = None,
+            check_out_date: Optional[str] = None
+        ):
             try:
-                return await AmadeusHotelTool.offer(hotel_id=hotel_id, adult_count=adult_count)
+                return await AmadeusHotelTool.offer(
+                    hotel_ids=hotel_ids,
+                    adult_count=adult_count,
+                    check_in_date=check_in_date,
+                    check_out_date=check_out_date
+                )
             except Exception as e:
                 logger.error(f"fetch_hotel_offer_tool error: {e}")
+                TOOL_ERRORS.inc("offer", "exception")
                 return {}
 
         return offer
 
+    @classmethod
+    def search_hotels_tool(cls):
+        @tool(
+            description=(
+                "Search hotels in a city in one step: finds hotels by IATA city code, "
+                "looks up their guest ratings and room offers, and returns the best options "
+                "ranked by price (default) or rating. Prefer this over calling fetch, rating "
+                "and offer separately. Each row has hotel_id, name, rating, offer_id, price, "
+                "currency, check_in, check_out and room."
+            )
+        )
+        async def search_hotels(
+            city_code: str,
+            adult_count: int = 1,
+            check_in_date: Optional[str] = None,
+            check_out_date: Optional[str] = None,
+            sort_by: str = "price",
+            limit: int = 5
+        ):
+            try:
+                return await AmadeusHotelTool.search_hotels(
+                    city_code=city_code,
+                    adult_count=adult_count,
+                    check_in_date=check_in_date,
+                    check_out_date=check_out_date,
+                    sort_by=sort_by,
+                    limit=limit
+                )
+            except Exception as e:
+                logger.error(f"search_hotels_tool error: {e}")
+                TOOL_ERRORS.inc("search_hotels", "exception")
+                return []
+
+        return search_hotels
+
     @classmethod
     def book_tool(cls):
         @tool(
             description=(
                 "Book a hotel using the provided HotelOrderSchema data, which includes "
-                "guest details, hotel ID, and room information. Returns booking confirmation or errors."
-            )
+                "guest details, hotel ID, and room information. The booking runs in the background: "
+                "returns a job_id and its status; use booking_status with the job_id to get the confirmation."
+            ),
+            response_format="content_and_artifact",
         )
-        async def book(data: HotelOrderSchema):
+        async def book(data: HotelOrderSchema, config: RunnableConfig):
             try:
-                return await AmadeusHotelTool.book(data)
+                job = await JobProducer.submit(
+                    "hotel_order",
+                    data.model_dump(mode="json"),
+                    session_id=session_id_from(config),
+                )
+                return booking_receipt(job), {"job_id": job.id}
             except Exception as e:
                 logger.error(f"book_hotel_tool error: {e}")
-                return {}
+                TOOL_ERRORS.inc("book", "exception")
+                return {}, None
 
         return book
 
@@ -1,8 +1,12 @@
+import asyncio
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from src.cache.disk import DiskCache
 from src.configs import env, http
-from src.tools.hotel.amadeus import auth
+from src.auth.amadeus import AmadeusAuth
 from src.schemas.hotel import HotelOrderSchema, GeoCode
+from src.schemas.serialization import dump_json
+from src.tools.flight.airports import AirportIndex
 
 # --- Configure logger ---
 logger = logging.getLogger(__name__)
@@ -15,14 +19,29 @@ if not logger.handlers:
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
+# Hotel IDs accepted per call by the offers and sentiments endpoints.
+OFFERS_MAX_HOTEL_IDS = 20
+SENTIMENTS_MAX_HOTEL_IDS = 3
+# Hotels from the city listing considered by search_hotels.
+SEARCH_CANDIDATE_HOTELS = 20
+# Offers are priced in one currency so they can be compared; flights are searched in USD too.
+OFFERS_CURRENCY = "USD"
+
 
 class AmadeusHotelTool:
+    # Hotel lists change about once a day, so they are kept on disk across workers and restarts.
+    _reference_cache = DiskCache(
+        name="hotel_reference",
+        path=env.HOTEL_CACHE_PATH,
+        ttl=env.HOTEL_REFERENCE_CACHE_TTL,
+        purge_interval=env.CACHE_PURGE_INTERVAL,
+    )
 
     @classmethod
     async def get_token(cls) -> str:
         """Retrieve the Amadeus API access token asynchronously."""
         try:
-            return await auth.AmadeusAuth.get_token()
+            return await AmadeusAuth.get_token()
         except Exception as e:
             logger.error(f"Failed to get token: {e}")
             raise RuntimeError("Unable to retrieve Amadeus API token.") from e
@@ -36,62 +55,83 @@ class AmadeusHotelTool:
     ):
         """Fetch hotel data by city code, geo coordinates, or hotel IDs."""
         try:
-            url = None
             if city_code:
-                url = (
-                    f"{env.AMADEUS_BASE_URL}/v1/reference-data/locations/hotels/by-city"
-                    f"?cityCode={city_code.upper()}"
-                )
+                path = "/v1/reference-data/locations/hotels/by-city"
+                params = {"cityCode": AirportIndex.city_code(city_code) or city_code.upper()}
             elif geo_code:
-                url = (
-                    f"{env.AMADEUS_BASE_URL}/v1/reference-data/locations/hotels/by-geocode"
-                    f"?latitude={geo_code.latitude}&longitude={geo_code.longitude}"
-                )
+                path = "/v1/reference-data/locations/hotels/by-geocode"
+                params = {"latitude": geo_code.latitude, "longitude": geo_code.longitude}
             elif hotel_id:
-                url = (
-                    f"{env.AMADEUS_BASE_URL}/v1/reference-data/locations/hotels/by-hotels"
-                    f"?hotelIds={hotel_id}"
-                )
+                path = "/v1/reference-data/locations/hotels/by-hotels"
+                params = {"hotelIds": hotel_id}
             else:
                 raise ValueError("At least one of hotel_id, geo_code, or city_code must be provided.")
 
-            token = await cls.get_token()
-            return await http.AsyncHTTPRequest.request(
-                method=http.Methods.GET,
-                url=url,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
-            )
+            async def request():
+                return await AmadeusAuth.request(
+                    method=http.Methods.GET,
+                    url=f"{env.AMADEUS_BASE_URL}{path}",
+                    params=params,
+                    headers={"Content-Type": "application/json"},
+                    coalesce=True
+                )
+
+            key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+            return await cls._reference_cache.get_or_fetch(key, request)
         except Exception as e:
             logger.error(f"Fetching hotel data failed: {e}")
             raise
 
+    @staticmethod
+    def _normalize_ids(hotel_ids: Union[str, List[str], None]) -> List[str]:
+        """Accept a list or a comma-separated string; drop blanks and duplicates, keep order."""
+        if isinstance(hotel_ids, str):
+            hotel_ids = hotel_ids.split(",")
+        return list(dict.fromkeys(h.strip().upper() for h in hotel_ids or [] if h and h.strip()))
+
+    @classmethod
+    async def _batched_get(cls, path: str, hotel_ids: List[str], chunk_size: int, params: Dict[str, Any]):
+        """GET `path` for `hotel_ids` in concurrent chunks and merge the `data` lists in order."""
+        chunks = [hotel_ids[i:i + chunk_size] for i in range(0, len(hotel_ids), chunk_size)]
+        responses = await asyncio.gather(
+            *(
+                AmadeusAuth.request(
+                    method=http.Methods.GET,
+                    url=f"{env.AMADEUS_BASE_URL}{path}",
+                    params={"hotelIds": ",".join(chunk), **params},
+                    headers={"Content-Type": "application/json"},
+                    coalesce=True
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+
+        failures = [r for r in responses if isinstance(r, Exception)]
+        if len(failures) == len(responses):
+            raise failures[0]
+        for failure in failures:
+            logger.warning(f"Partial failure fetching {path}: {failure}")
+
+        merged = {"data": []}
+        for response in responses:
+            if not isinstance(response, Exception):
+                merged["data"].extend(response.get("data", []))
+        return merged
+
     @classmethod
     async def rating(
         cls,
-        hotel_ids: Optional[List[str]] = None
+        hotel_ids: Union[str, List[str], None] = None
     ):
-        """Fetch hotel ratings / sentiment data."""
+        """Fetch hotel ratings / sentiment data for any number of hotels."""
         try:
+            hotel_ids = cls._normalize_ids(hotel_ids)
             if not hotel_ids:
                 raise ValueError("hotel_ids list must be provided for rating.")
 
-            hotel_ids_str = ",".join(hotel_ids)
-            url = (
-                f"{env.AMADEUS_BASE_URL}/v2/e-reputation/hotel-sentiments"
-                f"?hotelIds={hotel_ids_str}"
-            )
-
-            token = await cls.get_token()
-            return await http.AsyncHTTPRequest.request(
-                method=http.Methods.GET,
-                url=url,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
+            return await cls._batched_get(
+                "/v2/e-reputation/hotel-sentiments", hotel_ids, SENTIMENTS_MAX_HOTEL_IDS, {}
             )
         except Exception as e:
             logger.error(f"Fetching hotel ratings failed: {e}")
@@ -100,25 +140,91 @@ class AmadeusHotelTool:
     @classmethod
     async def offer(
         cls,
-        hotel_id: str,
-        adult_count: int = 1
+        hotel_ids: Union[str, List[str]],
+        adult_count: int = 1,
+        check_in_date: Optional[str] = None,
+        check_out_date: Optional[str] = None,
+        currency: str = OFFERS_CURRENCY
     ):
-        """Fetch hotel offers."""
+        """Fetch hotel offers for one or more hotels, priced in `currency`, chunked to the API's per-call limit."""
         try:
-            url = f"{env.AMADEUS_BASE_URL}/v3/shopping/hotel-offers?hotelIds={hotel_id}&adults={adult_count}"
-            token = await cls.get_token()
-            return await http.AsyncHTTPRequest.request(
-                method=http.Methods.GET,
-                url=url,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
+            hotel_ids = cls._normalize_ids(hotel_ids)
+            if not hotel_ids:
+                raise ValueError("At least one hotel ID must be provided for offers.")
+
+            params = {"adults": adult_count, "currency": currency}
+            if check_in_date:
+                params["checkInDate"] = check_in_date
+            if check_out_date:
+                params["checkOutDate"] = check_out_date
+
+            return await cls._batched_get(
+                "/v3/shopping/hotel-offers", hotel_ids, OFFERS_MAX_HOTEL_IDS, params
             )
         except Exception as e:
             logger.error(f"Fetching hotel offers failed: {e}")
             raise
 
+    @classmethod
+    async def search_hotels(
+        cls,
+        city_code: str,
+        adult_count: int = 1,
+        check_in_date: Optional[str] = None,
+        check_out_date: Optional[str] = None,
+        sort_by: str = "price",
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        One-call hotel search: hotels in the city, then their sentiments and offers
+        fetched concurrently, joined and ranked by `sort_by` ("price" or "rating").
+        Only hotels with an available offer are returned.
+        """
+        listing = await cls.fetch(city_code=city_code)
+        hotels = {h["hotelId"]: h for h in listing.get("data", [])[:SEARCH_CANDIDATE_HOTELS]}
+        if not hotels:
+            return []
+
+        ids = list(hotels)
+        offers, ratings = await asyncio.gather(
+            cls.offer(ids, adult_count, check_in_date, check_out_date),
+            cls.rating(ids),
+            return_exceptions=True,
+        )
+        if isinstance(offers, Exception):
+            raise offers
+        if isinstance(ratings, Exception):
+            logger.warning(f"Hotel sentiments unavailable, ranking without them: {ratings}")
+            ratings = {"data": []}
+
+        scores = {r["hotelId"]: r.get("overallRating") for r in ratings.get("data", [])}
+        rows = []
+        for entry in offers.get("data", []):
+            hotel_id = entry.get("hotel", {}).get("hotelId")
+            available = [o for o in entry.get("offers", []) if o.get("price", {}).get("total")]
+            if not entry.get("available", True) or not available:
+                continue
+            best = min(available, key=lambda o: float(o["price"]["total"]))
+            rows.append({
+                "hotel_id": hotel_id,
+                "name": entry.get("hotel", {}).get("name") or hotels.get(hotel_id, {}).get("name"),
+                "rating": scores.get(hotel_id),
+                "offer_id": best.get("id"),
+                "price": best["price"]["total"],
+                "currency": best["price"].get("currency"),
+                "check_in": best.get("checkInDate"),
+                "check_out": best.get("checkOutDate"),
+                "room": (best.get("room", {}).get("description", {}).get("text") or "")[:120],
+            })
+
+        # A hotel that cannot price in the requested currency is never ranked on price against the others.
+        foreign = lambda r: r["currency"] not in (None, OFFERS_CURRENCY)
+        if sort_by == "rating":
+            rows.sort(key=lambda r: (-(r["rating"] or 0), foreign(r), float(r["price"])))
+        else:
+            rows.sort(key=lambda r: (foreign(r), float(r["price"]), -(r["rating"] or 0)))
+        return rows[:limit]
+
     @classmethod
     async def book(
         cls,
@@ -127,15 +233,11 @@ class AmadeusHotelTool:
         """Book a hotel using the provided HotelOrderSchema data."""
         try:
             url = f"{env.AMADEUS_BASE_URL}/v2/booking/hotel-orders"
-            token = await cls.get_token()
-            return await http.AsyncHTTPRequest.request(
+            return await AmadeusAuth.request(
                 method=http.Methods.POST,
                 url=url,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                json=data.dict()
+                headers={"Content-Type": "application/json"},
+                content=dump_json(data)
             )
         except Exception as e:
             logger.error(f"Booking hotel failed: {e}")
@@ -25,8 +25,10 @@ class HotelToolRouter:
 
         if action == "fetch_hotel_offers":
             return await AmadeusHotelTool.offer(
-                hotel_id=payload["hotel_id"],
-                adult_count=payload.get("adult_count", 1)
+                hotel_ids=payload.get("hotel_ids") or payload["hotel_id"],
+                adult_count=payload.get("adult_count", 1),
+                check_in_date=payload.get("check_in_date"),
+                check_out_date=payload.get("check_out_date")
             )
 
         if action == "fetch_hotel_rating":
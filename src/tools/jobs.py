@@ -0,0 +1,84 @@
+import logging
+from typing import Any, Dict, Optional
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from src.broker.job import Job, JobStatus
+from src.broker.queue import job_queue
+from src.context.session import session_id_from
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+def _confirmation(result: Any) -> Dict[str, Any]:
+    """Order id and provider references from a flight- or hotel-order response."""
+    data = (result or {}).get("data") or {}
+    confirmation = {
+        "order_id": data.get("id"),
+        "references": [r.get("reference") for r in data.get("associatedRecords", [])],
+        "hotel_bookings": [
+            {"id": b.get("id"), "status": b.get("bookingStatus")}
+            for b in data.get("hotelBookings", [])
+        ],
+    }
+    return {k: v for k, v in confirmation.items() if v}
+
+
+async def session_job(job_id: str, session_id: str) -> Optional[Job]:
+    """The job with `job_id` if it belongs to `session_id`; another session's job is treated as unknown."""
+    job = await job_queue.store.get(job_id)
+    if job is None or job.session_id != session_id:
+        return None
+    return job
+
+
+def booking_receipt(job: Job) -> Dict[str, Any]:
+    """What the model sees about a booking job: its id, status and outcome once known."""
+    receipt: Dict[str, Any] = {"job_id": job.id, "status": job.status.value}
+    if job.status == JobStatus.SUCCEEDED:
+        receipt["confirmation"] = _confirmation(job.result)
+    elif job.status == JobStatus.DEAD:
+        receipt["error"] = job.error
+        if job.outcome_unknown:
+            receipt["note"] = (
+                "This booking was already attempted and may have gone through; that earlier attempt is "
+                "returned instead of booking again. Ask the traveler to check with the provider first."
+            )
+    elif job.attempts > 1:
+        receipt["attempts"] = job.attempts
+    return receipt
+
+
+class AgentJobTool:
+    """
+    LangChain tools for background jobs.
+    Provides async tools for:
+    - booking_status
+    """
+
+    @classmethod
+    def booking_status_tool(cls):
+        @tool(
+            description=(
+                "Check a booking started by create_order or book. "
+                "Input is the job_id those tools returned. Returns the status "
+                "(queued, running, succeeded, dead) and, when finished, the confirmation or error."
+            )
+        )
+        async def booking_status(job_id: str, config: RunnableConfig = None) -> Dict:
+            try:
+                job = await session_job(job_id, session_id_from(config))
+                if job is None:
+                    return {"error": f"Unknown job_id '{job_id}'."}
+                return booking_receipt(job)
+            except Exception as e:
+                logger.error(f"booking_status_tool error: {e}")
+                return {}
+
+        return booking_status
@@ -1,12 +1,17 @@
 from src.tools.flight.amadeus.agent_tool import AgentFlightTool
 from src.tools.hotel.amadeus.agent_tool import AgentHotelTool
+from src.tools.jobs import AgentJobTool
 
 tools = [
     AgentFlightTool.search_flights_tool(),
+    AgentFlightTool.search_flights_flexible_tool(),
+    AgentFlightTool.filter_flights_tool(),
     AgentFlightTool.get_flight_price_tool(),
     AgentFlightTool.create_order_tool(),
     AgentHotelTool.fetch_tool(),
     AgentHotelTool.rating_tool(),
     AgentHotelTool.offer_tool(),
-    AgentHotelTool.book_tool()
+    AgentHotelTool.search_hotels_tool(),
+    AgentHotelTool.book_tool(),
+    AgentJobTool.booking_status_tool()
 ]